@@ -8,7 +8,7 @@ import os
 import argparse
 import logging
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import multiprocessing
 
@@ -18,7 +18,13 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from stillgen.dependencies import check_dependencies
 from stillgen.parsers import parse_ale_files, parse_silverstack_files, LazyCSVLoader
 from stillgen.image_processor import StillProcessor
+from stillgen.cdl import TempFileManager
 from stillgen.config import Config, ProcessingProfile
+from stillgen.color_engine import COLOR_BACKENDS
+from stillgen.streaming import get_max_workers
+from stillgen.writer import TIFF_COMPRESSIONS
+from stillgen.prefetch import Prefetcher
+from stillgen.resources import get_registry, init_registry
 from stillgen.utils import find_tiff_files, process_in_batches
 
 # Set up logging
@@ -58,6 +64,9 @@ def parse_arguments():
                         help='Number of worker processes (default: CPU count)')
     parser.add_argument('--batch-size', type=int, default=10,
                         help='Batch size for processing (default: 10)')
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help='Parallelism mode: worker processes, or threads sharing one processor and '
+                             'in-memory caches (default: process)')
     parser.add_argument('--resume', action='store_true',
                         help='Resume processing (skip existing files)')
     parser.add_argument('--dry-run', action='store_true',
@@ -65,6 +74,41 @@ def parse_arguments():
     parser.add_argument('--verbose', action='store_true',
                         help='Enable verbose logging')
     parser.add_argument('--config-file', help='Optional configuration file (YAML/JSON)')
+    parser.add_argument('--color-backend', choices=COLOR_BACKENDS, default='auto',
+                        help='Color engine: in-process OCIO/NumPy or oiiotool subprocesses (default: auto)')
+    parser.add_argument('--batch-oiiotool', action='store_true',
+                        help='With the oiiotool backend, transform each batch with one oiiotool '
+                             'launch per (colorspace, CDL) group')
+    parser.add_argument('--bake-luts', action='store_true',
+                        help='Bake decode + CDL + output LUT into one cached 3D LUT per look')
+    parser.add_argument('--baked-lut-size', type=int, choices=[33, 65], default=33,
+                        help='Lattice size for baked LUTs (default: 33)')
+    parser.add_argument('--output-bit-depth', type=int, choices=[8, 16], default=8,
+                        help='Bits per channel of the output TIFF; 16 keeps the grade precision '
+                             '(needs the OpenImageIO Python bindings, default: 8)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Crop, color transform and resize each still in strips to bound memory')
+    parser.add_argument('--max-worker-memory', type=int, default=0, metavar='MB',
+                        help='Per-worker memory budget in MB; sets the streaming strip height and caps '
+                             'the worker count to fit physical memory (implies --streaming)')
+    parser.add_argument('--resize-threads', type=int, default=0, metavar='N',
+                        help='Threads per worker for banded resizing (default: CPU count divided by workers)')
+    parser.add_argument('--tiff-compression', choices=TIFF_COMPRESSIONS, default=None,
+                        help='Output TIFF codec (default: from --profile, deflate with horizontal predictor)')
+    parser.add_argument('--tiff-tile-size', type=int, default=None, metavar='PIXELS',
+                        help='Write tiled output TIFFs with square tiles of this size, e.g. 256 '
+                             '(needs the OpenImageIO Python bindings; default: strips)')
+    parser.add_argument('--writer-threads', type=int, default=2, metavar='N',
+                        help='Threads per worker writing output files behind processing (default: 2)')
+    parser.add_argument('--max-pending-writes', type=int, default=4, metavar='N',
+                        help='Outputs queued per worker before processing waits for storage (default: 4)')
+    parser.add_argument('--prefetch', type=int, default=2, metavar='N',
+                        help='Input files each worker reads ahead into the page cache while grading (0 = off, default: 2)')
+    parser.add_argument('--prefetch-memory', type=int, default=512, metavar='MB',
+                        help='Ceiling on read-ahead input data per worker in MB (default: 512)')
+    parser.add_argument('--output-size', action='append', default=[], metavar='WIDTH[:FORMAT]',
+                        help='Also write a smaller rendition derived from the master, e.g. 1920:jpeg '
+                             '(repeatable; formats: tiff, jpeg, png; default format: jpeg)')
     
     # EL Zone System options
     parser.add_argument('--el-zone', action='store_true',
@@ -96,26 +140,154 @@ def get_static_paths():
     }
 
 
-def process_batch(batch_args):
-    """Process a batch of images. Used for multiprocessing."""
-    batch_files, config, ale_data, silverstack_data, csv_loader = batch_args
-    results = []
+def process_file(processor, file_path, transformed_path=None, prefetcher=None):
+    """Process a single image and return (file_path, success, error)."""
+    try:
+        success = processor.process_image(file_path, transformed_path)
+        # Clean up any temporary CDL files
+        temp_cdl = os.path.join(os.path.dirname(file_path), f"tmp{os.path.basename(file_path)}.cdl")
+        if os.path.exists(temp_cdl):
+            os.remove(temp_cdl)
+        return file_path, success, None
+    except Exception as e:
+        return file_path, False, str(e)
+    finally:
+        if prefetcher is not None:
+            prefetcher.release(file_path)
+
+
+# The worker process's processor, built once by init_worker
+_worker_processor = None
+
+
+def init_worker(config, ale_data, silverstack_data, csv_loader):
+    """Pool initializer: set up the worker's resource registry and processor once.
+    
+    Fonts, logos, LUTs and EL Zone tables then live for the whole run in each
+    worker instead of being reloaded for every batch, and the metadata is sent to
+    each worker once rather than with every batch.
+    """
+    global _worker_processor
+    init_registry()
+    _worker_processor = StillProcessor(config, ale_data, silverstack_data, csv_loader)
+
+
+def process_batch(batch_files):
+    """Process a batch of images in a worker set up by init_worker. Used for multiprocessing."""
+    processor = _worker_processor
+    config = processor.config
+    
+    # With batched oiiotool, color-transform the whole batch in as few launches as possible
+    temp_manager = TempFileManager()
+    prefetcher = Prefetcher(batch_files, config.prefetch, config.prefetch_memory)
+    try:
+        transformed = processor.transform_batch(batch_files, temp_manager)
+        results = [process_file(processor, f, transformed.get(f), prefetcher) for f in batch_files]
+        
+        # Outputs are encoded in the background; a still only succeeds once its file is written
+        failed = set(processor.flush_writes())
+        get_registry().log_stats()
+        return [(f, False, "Failed to write output") if success and f in failed else (f, success, error)
+                for f, success, error in results]
+    finally:
+        prefetcher.close()
+        temp_manager.cleanup()
+
+
+def process_thread_batch(processor, batch_files, prefetcher):
+    """Process a batch on one thread of run_thread_pool, sharing the pool's processor."""
+    # With batched oiiotool, color-transform the whole batch in as few launches as possible
+    temp_manager = TempFileManager()
+    try:
+        transformed = processor.transform_batch(batch_files, temp_manager)
+        return [process_file(processor, f, transformed.get(f), prefetcher) for f in batch_files]
+    finally:
+        temp_manager.cleanup()
+
+
+def parse_output_size(value: str) -> dict:
+    """Parse a WIDTH[:FORMAT] --output-size value into a Config.outputs entry."""
+    width, _, output_format = value.partition(':')
+    entry = {'width': int(width)}
+    if output_format:
+        entry['format'] = output_format
+    return entry
+
+
+def run_process_pool(tiff_files, batch_size, num_workers, config, ale_data, 
+                     silverstack_data, csv_loader, logger):
+    """Process files in batches across worker processes."""
+    processed = 0
+    errors = []
+    
+    # Process in batches
+    batches = list(process_in_batches(tiff_files, batch_size))
+    
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker,
+                             initargs=(config, ale_data, silverstack_data, csv_loader)) as executor:
+        # Submit all batches
+        future_to_batch = {
+            executor.submit(process_batch, batch): i
+            for i, batch in enumerate(batches)
+        }
+        
+        # Process results with progress bar
+        with tqdm(total=len(tiff_files), desc="Processing images") as pbar:
+            for future in as_completed(future_to_batch):
+                batch_idx = future_to_batch[future]
+                try:
+                    results = future.result()
+                    for file_path, success, error in results:
+                        if success:
+                            processed += 1
+                        else:
+                            errors.append((file_path, error))
+                        pbar.update(1)
+                except Exception as e:
+                    logger.error(f"Batch {batch_idx} failed: {str(e)}")
+                    # Update progress bar for failed batch
+                    pbar.update(len(batches[batch_idx]))
     
-    # Create processor for this batch
+    return processed, errors
+
+
+def run_thread_pool(tiff_files, batch_size, num_workers, config, ale_data, silverstack_data, 
+                    csv_loader, logger):
+    """Process files on threads sharing one processor, its caches and the loaded metadata."""
+    succeeded = set()
+    errors = []
+    
+    # Threads share this process's resource registry and one processor
+    init_registry()
     processor = StillProcessor(config, ale_data, silverstack_data, csv_loader)
     
-    for file_path in batch_files:
-        try:
-            success = processor.process_image(file_path)
-            # Clean up any temporary CDL files
-            temp_cdl = os.path.join(os.path.dirname(file_path), f"tmp{os.path.basename(file_path)}.cdl")
-            if os.path.exists(temp_cdl):
-                os.remove(temp_cdl)
-            results.append((file_path, success, None))
-        except Exception as e:
-            results.append((file_path, False, str(e)))
-    
-    return results
+    # One read-ahead window in file order, shared by the threads
+    prefetcher = Prefetcher(tiff_files, config.prefetch * num_workers,
+                            config.prefetch_memory * num_workers, workers=num_workers)
+    
+    # Batched oiiotool needs a batch per launch; otherwise threads take one still at a time
+    batches = list(process_in_batches(tiff_files, batch_size if config.batch_oiiotool else 1))
+    
+    with prefetcher, ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(process_thread_batch, processor, batch, prefetcher) for batch in batches]
+        
+        with tqdm(total=len(tiff_files), desc="Processing images") as pbar:
+            for future in as_completed(futures):
+                for file_path, success, error in future.result():
+                    if success:
+                        succeeded.add(file_path)
+                    else:
+                        errors.append((file_path, error))
+                    pbar.update(1)
+    
+    # A still with several failed writes (master and renditions) is counted once, and a
+    # still that already failed keeps its own error
+    for file_path in sorted(set(processor.flush_writes()) & succeeded):
+        succeeded.discard(file_path)
+        errors.append((file_path, "Failed to write output"))
+    get_registry().log_stats()
+    
+    return len(succeeded), errors
 
 
 def main():
@@ -137,7 +309,7 @@ def main():
     # Check dependencies
     if not args.dry_run:
         logger.info("Checking dependencies...")
-        if not check_dependencies():
+        if not check_dependencies(require_oiiotool=args.color_backend == 'oiiotool'):
             logger.error("Dependency check failed. Please install missing dependencies.")
             sys.exit(1)
     
@@ -155,6 +327,21 @@ def main():
         silverstack_csv_folder=args.silverstack_csv_folder,
         profile=ProcessingProfile(args.profile),
         resume=args.resume,
+        color_backend=args.color_backend,
+        batch_oiiotool=args.batch_oiiotool,
+        bake_luts=args.bake_luts,
+        baked_lut_size=args.baked_lut_size,
+        output_bit_depth=args.output_bit_depth,
+        streaming=args.streaming or args.max_worker_memory > 0,
+        max_worker_memory=args.max_worker_memory,
+        resize_threads=args.resize_threads,
+        tiff_compression=args.tiff_compression,
+        tiff_tile_size=args.tiff_tile_size,
+        writer_threads=args.writer_threads,
+        max_pending_writes=args.max_pending_writes,
+        prefetch=args.prefetch,
+        prefetch_memory=args.prefetch_memory,
+        outputs=[parse_output_size(value) for value in args.output_size],
         # Override with static paths
         logo_image=static_paths['logo_image'],
         tool_image=static_paths['tool_image'],
@@ -225,46 +412,30 @@ def main():
             logger.info(f"  ... and {len(tiff_files) - 10} more files")
         return
     
-    # Process files
-    processed = 0
-    errors = []
-    
     # Determine number of workers
     num_workers = args.workers or multiprocessing.cpu_count()
-    logger.info(f"Using {num_workers} worker processes")
+    max_workers = get_max_workers(config.max_worker_memory)
+    if max_workers is not None and num_workers > max_workers:
+        logger.info(f"Limiting workers to {max_workers} for a {config.max_worker_memory} MB per-worker budget")
+        num_workers = max_workers
     
-    # Process in batches
-    batches = list(process_in_batches(tiff_files, args.batch_size))
+    # Split the CPUs between workers so banded resizes don't oversubscribe them
+    if config.resize_threads <= 0:
+        config.resize_threads = max(1, multiprocessing.cpu_count() // num_workers)
     
-    with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        # Prepare batch arguments
-        batch_args = [
-            (batch, config, ale_data, silverstack_data, csv_loader)
-            for batch in batches
-        ]
-        
-        # Submit all batches
-        future_to_batch = {
-            executor.submit(process_batch, args): i
-            for i, args in enumerate(batch_args)
-        }
-        
-        # Process results with progress bar
-        with tqdm(total=len(tiff_files), desc="Processing images") as pbar:
-            for future in as_completed(future_to_batch):
-                batch_idx = future_to_batch[future]
-                try:
-                    results = future.result()
-                    for file_path, success, error in results:
-                        if success:
-                            processed += 1
-                        else:
-                            errors.append((file_path, error))
-                        pbar.update(1)
-                except Exception as e:
-                    logger.error(f"Batch {batch_idx} failed: {str(e)}")
-                    # Update progress bar for failed batch
-                    pbar.update(len(batches[batch_idx]))
+    # Process files
+    if args.executor == 'thread':
+        logger.info(f"Using {num_workers} worker threads")
+        processed, errors = run_thread_pool(
+            tiff_files, args.batch_size, num_workers, config, ale_data, silverstack_data,
+            csv_loader, logger
+        )
+    else:
+        logger.info(f"Using {num_workers} worker processes")
+        processed, errors = run_process_pool(
+            tiff_files, args.batch_size, num_workers, config, ale_data, 
+            silverstack_data, csv_loader, logger
+        )
     
     # Report results
     logger.info(f"\n=== Processing Complete ===")
@@ -3,15 +3,39 @@ import re
 import os
 import tempfile
 import hashlib
+import threading
 from typing import Tuple, Optional
 import logging
 from functools import lru_cache
 
+import numpy as np
+
+from .utils import write_atomic
+
 logger = logging.getLogger(__name__)
 
+try:
+    import PyOpenColorIO as OCIO
+    HAS_OCIO = True
+except ImportError:
+    HAS_OCIO = False
+
+
+# Rec.709 luma weights used by the ASC CDL saturation operator
+CDL_LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
 
+
+def _write_text(path: str, content: str):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+@lru_cache(maxsize=1024)
 def parse_asc_sop(asc_sop: str) -> Tuple[str, str, str]:
-    """Parse ASC_SOP string into slope, offset, and power."""
+    """Parse ASC_SOP string into slope, offset, and power.
+    
+    Results are cached per raw string, so each look is validated once per process.
+    """
     match = re.match(r'\(([^)]+)\)\(([^)]+)\)\(([^)]+)\)', asc_sop)
     if not match:
         raise ValueError(f"Invalid ASC_SOP format: {asc_sop}")
@@ -100,8 +124,8 @@ class CDLCache:
         cache_key = self._get_cache_key(asc_sop, asc_sat)
         cache_path = os.path.join(self.cache_dir, f"{cache_key}.cdl")
         
-        with open(cache_path, 'w') as f:
-            f.write(content)
+        # Write under a temporary name so concurrent readers never see a partial file
+        write_atomic(cache_path, _write_text, content)
         
         # Return absolute path
         abs_path = os.path.abspath(cache_path)
@@ -111,16 +135,18 @@ class CDLCache:
 
 # Global cache instance
 _cdl_cache = None
+_cache_lock = threading.Lock()
 
 
 def get_cdl_cache(cache_dir: Optional[str] = None) -> CDLCache:
     """Get global CDL cache instance."""
     global _cdl_cache
-    if _cdl_cache is None:
-        # Use cache directory in the current working directory
-        if cache_dir is None:
-            cache_dir = os.path.join(os.getcwd(), ".stillgen_cache", "cdl")
-        _cdl_cache = CDLCache(cache_dir)
+    with _cache_lock:
+        if _cdl_cache is None:
+            # Use cache directory in the current working directory
+            if cache_dir is None:
+                cache_dir = os.path.join(os.getcwd(), ".stillgen_cache", "cdl")
+            _cdl_cache = CDLCache(cache_dir)
     return _cdl_cache
 
 
@@ -153,15 +179,121 @@ def create_cdl_file(asc_sop: str, asc_sat: str, use_cache: bool = False) -> str:
             return f.name
 
 
+@lru_cache(maxsize=1024)
+def parse_cdl_values(asc_sop: str, asc_sat: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """Parse ASC_SOP/ASC_SAT strings into numeric slope, offset, power and saturation.
+    
+    Cached per look; the returned arrays are read-only and shared between callers.
+    """
+    slope, offset, power = parse_asc_sop(asc_sop)
+    
+    try:
+        saturation = float(asc_sat)
+    except ValueError:
+        raise ValueError(f"Invalid ASC_SAT value: {asc_sat}")
+    
+    values = []
+    for component in (slope, offset, power):
+        array = np.array(component.split(), dtype=np.float32)
+        array.setflags(write=False)
+        values.append(array)
+    
+    return values[0], values[1], values[2], saturation
+
+
+@lru_cache(maxsize=64)
+def _get_cdl_lut_uint16(slope: Tuple[float, ...], offset: Tuple[float, ...],
+                        power: Tuple[float, ...], clamp: bool) -> np.ndarray:
+    """Per-channel 65536-entry table mapping 16-bit code values through slope/offset/power."""
+    codes = np.linspace(0.0, 1.0, 65536, dtype=np.float32)[np.newaxis, :]
+    values = codes * np.array(slope, dtype=np.float32)[:, np.newaxis]
+    values += np.array(offset, dtype=np.float32)[:, np.newaxis]
+    if clamp:
+        np.clip(values, 0.0, 1.0, out=values)
+    else:
+        np.maximum(values, 0.0, out=values)
+    np.power(values, np.array(power, dtype=np.float32)[:, np.newaxis], out=values)
+    
+    table = (np.clip(values, 0.0, 1.0) * 65535.0 + 0.5).astype(np.uint16)
+    table.setflags(write=False)
+    return table
+
+
+def apply_cdl(image: np.ndarray, slope: np.ndarray, offset: np.ndarray, 
+              power: np.ndarray, saturation: float, clamp: bool = False,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply an ASC CDL to an (..., 3) float32 or uint16 image.
+    
+    The default matches OCIO's file-based CDL (no clamping except negative values
+    before the power function). With clamp=True the ASC v1.2 [0, 1] clamps apply.
+    
+    Pass out=image to work in place. uint16 images with saturation 1.0 go through a
+    per-channel 1D LUT; results above 1.0 are clipped to the 16-bit range.
+    """
+    if image.dtype == np.uint16:
+        if saturation == 1.0:
+            return _apply_cdl_uint16(image, slope, offset, power, clamp, out)
+        converted = apply_cdl(image.astype(np.float32) / 65535.0, slope, offset, power,
+                              saturation, clamp)
+        if out is None:
+            out = np.empty(image.shape, dtype=np.uint16)
+        np.clip(converted, 0.0, 1.0, out=converted)
+        converted *= 65535.0
+        converted += 0.5
+        out[...] = converted
+        return out
+    
+    if out is None:
+        out = np.empty(image.shape, dtype=np.float32)
+    
+    np.multiply(image, slope, out=out)
+    out += offset
+    if clamp:
+        np.clip(out, 0.0, 1.0, out=out)
+    else:
+        np.maximum(out, 0.0, out=out)
+    np.power(out, power, out=out)
+    
+    if saturation != 1.0:
+        luma = (out @ CDL_LUMA_WEIGHTS)[..., np.newaxis]
+        out -= luma
+        out *= saturation
+        out += luma
+    
+    if clamp:
+        np.clip(out, 0.0, 1.0, out=out)
+    
+    return out
+
+
+def _apply_cdl_uint16(image: np.ndarray, slope: np.ndarray, offset: np.ndarray,
+                      power: np.ndarray, clamp: bool,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    table = _get_cdl_lut_uint16(tuple(slope.tolist()), tuple(offset.tolist()),
+                                tuple(power.tolist()), clamp)
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint16)
+    for channel in range(3):
+        # Gather before writing so out may alias image
+        out[..., channel] = table[channel][image[..., channel]]
+    return out
+
+
+def render_ocio_config(template_path: str, cdl_path: str, lut_dir: str) -> str:
+    """Return OCIO config text with the CDL path and LUT search path filled in."""
+    with open(template_path, 'r') as f:
+        config_data = f.read()
+    
+    # Replace placeholders
+    config_data = config_data.replace("cd.cdl", cdl_path)
+    config_data = config_data.replace("search_path: luts", f"search_path: {lut_dir}")
+    return config_data
+
+
 def update_ocio_config(template_path: str, cdl_path: str, lut_dir: str) -> str:
     """Update OCIO config with CDL path and return temporary config path."""
     try:
-        with open(template_path, 'r') as f:
-            config_data = f.read()
-        
-        # Replace placeholders
-        config_data = config_data.replace("cd.cdl", cdl_path)
-        config_data = config_data.replace("search_path: luts", f"search_path: {lut_dir}")
+        config_data = render_ocio_config(template_path, cdl_path, lut_dir)
         
         # Create temporary config file
         with tempfile.NamedTemporaryFile(mode='w', suffix='.ocio', delete=False) as f:
@@ -173,6 +305,102 @@ def update_ocio_config(template_path: str, cdl_path: str, lut_dir: str) -> str:
         raise
 
 
+class OCIOConfigCache:
+    """Content-addressed cache of rendered OCIO configs and compiled processors.
+    
+    Configs are keyed by (template hash, CDL path, lut_dir), so every image and
+    worker sharing a look reuses the same .ocio file instead of writing a new one.
+    """
+    
+    def __init__(self, cache_dir: str = None):
+        if cache_dir is None:
+            cache_dir = os.path.abspath(".stillgen_cache/ocio")
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._template_hashes = {}
+        self._config_paths = {}
+        self._configs = {}
+        self._processors = {}
+        self._lock = threading.Lock()
+    
+    def _get_template_hash(self, template_path: str) -> str:
+        """Hash template content, memoized per path and modification time."""
+        stat = os.stat(template_path)
+        memo_key = (template_path, stat.st_mtime_ns, stat.st_size)
+        template_hash = self._template_hashes.get(memo_key)
+        if template_hash is None:
+            with open(template_path, 'rb') as f:
+                template_hash = hashlib.md5(f.read()).hexdigest()
+            self._template_hashes[memo_key] = template_hash
+        return template_hash
+    
+    def _get_cache_key(self, template_path: str, cdl_path: str, lut_dir: str) -> str:
+        """Generate cache key from template content, CDL and LUT directory."""
+        content = f"{self._get_template_hash(template_path)}:{cdl_path}:{lut_dir}"
+        return hashlib.md5(content.encode()).hexdigest()
+    
+    def get_config_path(self, template_path: str, cdl_path: str, lut_dir: str) -> str:
+        """Return the path of a rendered config, writing it on first use."""
+        cache_key = self._get_cache_key(template_path, cdl_path, lut_dir)
+        
+        path = self._config_paths.get(cache_key)
+        if path and os.path.exists(path):
+            return path
+        
+        path = os.path.join(self.cache_dir, f"{cache_key}.ocio")
+        if not os.path.exists(path):
+            config_data = render_ocio_config(template_path, cdl_path, lut_dir)
+            # Write under a temporary name so concurrent workers never see a partial file
+            write_atomic(path, _write_text, config_data)
+            logger.debug(f"Cached OCIO config: {os.path.basename(path)}")
+        
+        self._config_paths[cache_key] = path
+        return path
+    
+    def get_config(self, template_path: str, cdl_path: str, lut_dir: str):
+        """Return a parsed PyOpenColorIO config for the look."""
+        if not HAS_OCIO:
+            raise RuntimeError("PyOpenColorIO is not available")
+        
+        cache_key = self._get_cache_key(template_path, cdl_path, lut_dir)
+        config = self._configs.get(cache_key)
+        if config is None:
+            with self._lock:
+                config = self._configs.get(cache_key)
+                if config is None:
+                    config_path = self.get_config_path(template_path, cdl_path, lut_dir)
+                    config = OCIO.Config.CreateFromFile(config_path)
+                    self._configs[cache_key] = config
+        return config
+    
+    def get_processor(self, template_path: str, cdl_path: str, lut_dir: str,
+                      source: str, destination: str):
+        """Return a compiled PyOpenColorIO CPU processor for source -> destination."""
+        cache_key = (self._get_cache_key(template_path, cdl_path, lut_dir), source, destination)
+        processor = self._processors.get(cache_key)
+        if processor is None:
+            config = self.get_config(template_path, cdl_path, lut_dir)
+            processor = config.getProcessor(source, destination).getDefaultCPUProcessor()
+            # OCIO CPU processors are immutable and safe to share between threads
+            self._processors[cache_key] = processor
+        return processor
+
+
+# Global OCIO config cache instance
+_ocio_config_cache = None
+
+
+def get_ocio_config_cache(cache_dir: Optional[str] = None) -> OCIOConfigCache:
+    """Get global OCIO config cache instance."""
+    global _ocio_config_cache
+    with _cache_lock:
+        if _ocio_config_cache is None:
+            if cache_dir is None:
+                cache_dir = os.path.join(os.getcwd(), ".stillgen_cache", "ocio")
+            _ocio_config_cache = OCIOConfigCache(cache_dir)
+    return _ocio_config_cache
+
+
 class ColorspaceDetector:
     """Detect source colorspace based on camera metadata."""
     
@@ -244,6 +472,11 @@ class TempFileManager:
             if os.path.dirname(file_path) == temp_dir:
                 self.temp_dirs.add(temp_dir)
     
+    def add_dir(self, dir_path: str):
+        """Add a directory to be removed (once empty) during cleanup."""
+        if dir_path:
+            self.temp_dirs.add(dir_path)
+    
     def cleanup(self):
         """Clean up all temporary files and directories."""
         for file_path in self.temp_files:
@@ -0,0 +1,470 @@
+# color_engine.py - In-process color transforms
+import os
+import subprocess
+import tempfile
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from .cdl import create_cdl_file, parse_cdl_values, apply_cdl, get_ocio_config_cache
+from .lut import Lut3D, load_cube, apply_lut3d
+from .resources import get_registry
+from .utils import write_atomic
+
+logger = logging.getLogger(__name__)
+
+try:
+    import PyOpenColorIO as OCIO
+    HAS_OCIO = True
+except ImportError:
+    HAS_OCIO = False
+    logger.debug("PyOpenColorIO not available. Using NumPy color engine.")
+
+try:
+    import OpenImageIO as oiio
+    HAS_OIIO = True
+except ImportError:
+    HAS_OIIO = False
+    logger.debug("OpenImageIO Python bindings not available. Using PIL for image loading.")
+
+# Display colorspace defined in config_template.ocio (CDL + output LUT)
+OUTPUT_COLORSPACE = "Output_w_Look"
+
+COLOR_BACKENDS = ["auto", "ocio", "numpy", "oiiotool"]
+
+# Placeholder replaced with the per-look CDL path by update_ocio_config
+CDL_PLACEHOLDER = "cd.cdl"
+
+# Pixels transformed at a time; OCIO CPU processors allocate several times the block they apply to
+TRANSFORM_BLOCK_PIXELS = 1 << 16
+
+
+def _row_blocks(image: np.ndarray):
+    """Consecutive row bands (views) of an (..., 3) image, about TRANSFORM_BLOCK_PIXELS each."""
+    row_pixels = max(1, int(np.prod(image.shape[1:-1])))
+    rows = max(1, TRANSFORM_BLOCK_PIXELS // row_pixels)
+    for start in range(0, image.shape[0], rows):
+        yield image[start:start + rows]
+
+
+class _OCIOTemplateLoader(yaml.SafeLoader):
+    """YAML loader that accepts OCIO's !<Tag> nodes."""
+
+
+def _construct_ocio_node(loader, tag_suffix, node):
+    if isinstance(node, yaml.MappingNode):
+        data = loader.construct_mapping(node, deep=True)
+        data['_type'] = tag_suffix
+        return data
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node, deep=True)
+    return loader.construct_scalar(node)
+
+
+_OCIOTemplateLoader.add_multi_constructor('', _construct_ocio_node)
+
+
+class OCIOTemplate:
+    """Interpretation of config_template.ocio for the NumPy engine."""
+
+    def __init__(self, template_path: str, lut_dir: str):
+        self.template_path = template_path
+        self.lut_dir = lut_dir
+
+        with open(template_path, 'r') as f:
+            data = yaml.load(f, Loader=_OCIOTemplateLoader)
+
+        self.colorspaces = {cs['name']: cs for cs in data.get('colorspaces', [])}
+
+    def get_ops(self, source: str, destination: str) -> List[Tuple[str, str]]:
+        """Return the (kind, file) op list converting source -> reference -> destination."""
+        for name in (source, destination):
+            if name not in self.colorspaces:
+                raise ValueError(f"Unknown colorspace: {name}")
+
+        src = self.colorspaces[source]
+        dst = self.colorspaces[destination]
+        if src.get('isdata') or dst.get('isdata') or source == destination:
+            return []
+
+        if 'from_reference' in src and 'to_reference' not in src:
+            raise ValueError(f"Inverse transform required for source colorspace: {source}")
+        if 'to_reference' in dst and 'from_reference' not in dst:
+            raise ValueError(f"Inverse transform required for destination colorspace: {destination}")
+
+        ops = []
+        for transform in (src.get('to_reference'), dst.get('from_reference')):
+            if transform:
+                ops.extend(self._flatten(transform))
+        return ops
+
+    def _flatten(self, transform: Dict) -> List[Tuple[str, str]]:
+        kind = transform.get('_type')
+        if transform.get('direction', 'forward') != 'forward':
+            raise ValueError(f"Unsupported inverse {kind} in {self.template_path}")
+
+        if kind == 'GroupTransform':
+            ops = []
+            for child in transform.get('children', []):
+                ops.extend(self._flatten(child))
+            return ops
+
+        if kind == 'FileTransform':
+            src = transform['src']
+            ext = os.path.splitext(src)[1].lower()
+            if src == CDL_PLACEHOLDER:
+                return [('look', src)]
+            if ext == '.cube':
+                return [('lut3d', os.path.join(self.lut_dir, src))]
+            if ext in ('.cdl', '.cc'):
+                return [('cdl', os.path.join(self.lut_dir, src))]
+            raise ValueError(f"Unsupported LUT format for NumPy engine: {src}")
+
+        raise ValueError(f"Unsupported OCIO transform for NumPy engine: {kind}")
+
+
+def _read_cdl_file(cdl_path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """Read slope/offset/power/saturation from a .cdl or .cc file."""
+    import xml.etree.ElementTree as ET
+
+    root = ET.parse(cdl_path).getroot()
+    values = {}
+    for element in root.iter():
+        tag = element.tag.split('}')[-1]
+        if tag in ('Slope', 'Offset', 'Power', 'Saturation') and tag not in values:
+            values[tag] = element.text.strip()
+
+    asc_sop = f"({values['Slope']})({values['Offset']})({values['Power']})"
+    return parse_cdl_values(asc_sop, values.get('Saturation', '1.0'))
+
+
+class BakedLUTCache:
+    """LRU cache of per-look 3D LUTs baking source decode + CDL + output LUT.
+
+    Baked lattices live in memory and as .npy files under the cache directory,
+    keyed by the template/LUT fingerprint, source colorspace and CDL values.
+    """
+
+    def __init__(self, engine: 'ColorEngine', cache_dir: str, size: int = 33,
+                 max_entries: int = 64):
+        if size < 2:
+            raise ValueError(f"Baked LUT size must be at least 2, got {size}")
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_entries = max_entries
+        self._memory_cache: 'OrderedDict[str, Lut3D]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = self._get_fingerprint()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_fingerprint(self) -> str:
+        """Hash the template and LUT directory so edits invalidate baked LUTs."""
+        digest = hashlib.md5()
+        with open(self.engine.config_template_path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(self.engine.lut_dir.encode())
+        if os.path.isdir(self.engine.lut_dir):
+            for name in sorted(os.listdir(self.engine.lut_dir)):
+                stat = os.stat(os.path.join(self.engine.lut_dir, name))
+                digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def _get_cache_key(self, source: str, destination: str, asc_sop: str, asc_sat: str) -> str:
+        content = f"{self._fingerprint}:{self.size}:{source}:{destination}:{asc_sop}:{asc_sat}"
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def get(self, source: str, destination: str, asc_sop: str, asc_sat: str) -> Lut3D:
+        """Return the baked LUT for a look, baking it on first use."""
+        key = self._get_cache_key(source, destination, asc_sop, asc_sat)
+
+        with self._lock:
+            lut = self._memory_cache.get(key)
+            if lut is not None:
+                self._memory_cache.move_to_end(key)
+                return lut
+
+        cache_path = os.path.join(self.cache_dir, f"{key}.npy")
+        if os.path.exists(cache_path):
+            try:
+                lut = Lut3D(np.load(cache_path, mmap_mode='r'))
+                os.utime(cache_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable baked LUT {cache_path}: {e}")
+                lut = None
+
+        if lut is None:
+            lut = self._bake(source, destination, asc_sop, asc_sat)
+            self._save(cache_path, lut)
+
+        with self._lock:
+            self._memory_cache[key] = lut
+            while len(self._memory_cache) > self.max_entries:
+                self._memory_cache.popitem(last=False)
+        return lut
+
+    def _bake(self, source: str, destination: str, asc_sop: str, asc_sat: str) -> Lut3D:
+        logger.debug(f"Baking {self.size}-point LUT for {source} with CDL {asc_sop} {asc_sat}")
+        grid = np.linspace(0.0, 1.0, self.size, dtype=np.float32)
+        lattice = np.stack(np.meshgrid(grid, grid, grid, indexing='ij'), axis=-1)
+        table = self.engine._apply_direct(lattice, source, destination, asc_sop, asc_sat)
+        return Lut3D(np.ascontiguousarray(table, dtype=np.float32))
+
+    def _save(self, cache_path: str, lut: Lut3D):
+        """Write atomically so concurrent workers never read a partial file."""
+        try:
+            write_atomic(cache_path, np.save, lut.table)
+        except OSError as e:
+            logger.warning(f"Failed to cache baked LUT {cache_path}: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used baked LUTs beyond max_entries."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npy'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    continue
+
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                logger.debug(f"Evicted baked LUT: {os.path.basename(path)}")
+            except OSError:
+                pass
+
+
+class ColorEngine:
+    """Apply the source -> linear -> CDL -> output LUT chain to NumPy arrays."""
+
+    def __init__(self, config_template_path: str, lut_dir: str, backend: str = "auto",
+                 bake_luts: bool = False, baked_lut_size: int = 33,
+                 cache_dir: str = ".stillgen_cache", max_baked_luts: int = 64):
+        self.config_template_path = config_template_path
+        self.lut_dir = os.path.abspath(lut_dir)
+        self.backend = self._resolve_backend(backend)
+        self.lut_cache_dir = os.path.join(cache_dir, "luts")
+
+        self._template = None
+        self._lut_processors = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        self.baked_luts = None
+        if bake_luts:
+            if self.in_process:
+                self.baked_luts = BakedLUTCache(
+                    self, os.path.join(cache_dir, "baked_luts"),
+                    size=baked_lut_size, max_entries=max_baked_luts
+                )
+            else:
+                logger.warning("Baked LUTs need an in-process color backend, ignoring for oiiotool")
+
+        logger.debug(f"Color engine backend: {self.backend} (baked LUTs: {self.baked_luts is not None})")
+
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        if backend not in COLOR_BACKENDS:
+            raise ValueError(f"Unknown color backend '{backend}'. Choose from: {', '.join(COLOR_BACKENDS)}")
+        if backend == "auto":
+            return "ocio" if HAS_OCIO else "numpy"
+        if backend == "ocio" and not HAS_OCIO:
+            logger.warning("PyOpenColorIO not available, falling back to NumPy color engine")
+            return "numpy"
+        return backend
+
+    @property
+    def in_process(self) -> bool:
+        """Whether transforms run inside this process (not via oiiotool)."""
+        return self.backend != "oiiotool"
+
+    def apply(self, image: np.ndarray, source_colorspace: str,
+              asc_sop: str, asc_sat: str,
+              destination: str = OUTPUT_COLORSPACE) -> np.ndarray:
+        """Transform a float32 (H, W, 3) image from source_colorspace to destination."""
+        if self.baked_luts is not None:
+            lut = self.baked_luts.get(source_colorspace, destination, asc_sop, asc_sat)
+            return self.apply_lut(image, lut)
+        return self._apply_direct(image, source_colorspace, destination, asc_sop, asc_sat)
+
+    def apply_lut(self, image: np.ndarray, lut: Lut3D) -> np.ndarray:
+        """Apply a 3D LUT, through an OCIO CPU processor when that backend is active."""
+        if self.backend != "ocio" or lut.domain_min != (0.0, 0.0, 0.0) or lut.domain_max != (1.0, 1.0, 1.0):
+            return apply_lut3d(image, lut)
+
+        with self._lock:
+            processor = self._lut_processors.get(lut)
+            if processor is None:
+                transform = OCIO.Lut3DTransform()
+                transform.setGridSize(lut.size)
+                # Copy: cached lattices are read-only memory maps
+                transform.setData(np.array(lut.table, dtype=np.float32).reshape(-1))
+                transform.setInterpolation(OCIO.INTERP_TETRAHEDRAL)
+                processor = OCIO.Config.CreateRaw().getProcessor(transform).getDefaultCPUProcessor()
+                self._lut_processors[lut] = processor
+
+        return self._apply_processor(processor, image)
+
+    @staticmethod
+    def _apply_processor(processor, image: np.ndarray) -> np.ndarray:
+        """Apply an OCIO CPU processor to a float32 copy of image, block by block."""
+        result = np.array(image, dtype=np.float32, order='C')
+        for block in _row_blocks(result):
+            processor.applyRGB(block)
+        return result
+
+    def _apply_direct(self, image: np.ndarray, source_colorspace: str, destination: str,
+                      asc_sop: str, asc_sat: str) -> np.ndarray:
+        """Evaluate the full transform chain without baking."""
+        if self.backend == "ocio":
+            return self._apply_ocio(image, source_colorspace, destination, asc_sop, asc_sat)
+        if self.backend == "numpy":
+            return self._apply_numpy(image, source_colorspace, destination, asc_sop, asc_sat)
+        raise RuntimeError("The oiiotool backend transforms files, not arrays")
+
+    def _apply_ocio(self, image: np.ndarray, source: str, destination: str,
+                    asc_sop: str, asc_sat: str) -> np.ndarray:
+        cdl_path = create_cdl_file(asc_sop, asc_sat, use_cache=True)
+        processor = get_ocio_config_cache().get_processor(
+            self.config_template_path, cdl_path, self.lut_dir, source, destination
+        )
+        return self._apply_processor(processor, image)
+
+    def _apply_numpy(self, image: np.ndarray, source: str, destination: str,
+                     asc_sop: str, asc_sat: str) -> np.ndarray:
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    self._template = OCIOTemplate(self.config_template_path, self.lut_dir)
+
+        steps = []
+        for kind, path in self._template.get_ops(source, destination):
+            if kind == 'lut3d':
+                steps.append((apply_lut3d, (self._get_lut(path),)))
+            elif kind == 'look':
+                steps.append((apply_cdl, parse_cdl_values(asc_sop, asc_sat)))
+            elif kind == 'cdl':
+                steps.append((apply_cdl, _read_cdl_file(path)))
+
+        # Block by block in place, so the CDL's temporaries stay block-sized
+        result = image.astype(np.float32)
+        for block in _row_blocks(result):
+            for apply_step, args in steps:
+                apply_step(block, *args, out=block)
+        return result
+
+    def _get_lut(self, path: str) -> Lut3D:
+        return get_registry().luts.get((os.path.abspath(path), self.lut_cache_dir),
+                                       lambda: load_cube(path, cache_dir=self.lut_cache_dir))
+
+
+def load_image_array(image_path: str) -> np.ndarray:
+    """Load an image as a float32 (H, W, 3) array in the 0-1 range."""
+    if HAS_OIIO:
+        buf = oiio.ImageBuf(image_path)
+        if buf.has_error:
+            raise IOError(f"Failed to read {image_path}: {buf.geterror()}")
+        pixels = buf.get_pixels(oiio.FLOAT)
+        if pixels.ndim == 2:
+            pixels = pixels[..., np.newaxis]
+        if pixels.shape[-1] == 1:
+            pixels = np.repeat(pixels, 3, axis=-1)
+        return np.ascontiguousarray(pixels[..., :3])
+
+    image = Image.open(image_path)
+    if image.mode in ('I;16', 'I;16B', 'I;16L', 'I'):
+        pixels = np.asarray(image, dtype=np.float32) / 65535.0
+        return np.repeat(pixels[..., np.newaxis], 3, axis=-1)
+    return np.asarray(image.convert('RGB'), dtype=np.float32) / 255.0
+
+
+def save_image_array(image_path: str, pixels: np.ndarray,
+                     attributes: Optional[Dict] = None, tile_size: int = 0):
+    """Write a uint8/uint16 (H, W, C) array with OpenImageIO, keeping its bit depth.
+
+    attributes are set on the output ImageSpec (e.g. compression); tile_size > 0
+    writes square tiles instead of strips.
+    """
+    if not HAS_OIIO:
+        raise RuntimeError("Writing 16-bit images needs the OpenImageIO Python bindings")
+
+    height, width, channels = pixels.shape
+    pixel_type = oiio.UINT16 if pixels.dtype == np.uint16 else oiio.UINT8
+    spec = oiio.ImageSpec(width, height, channels, pixel_type)
+    for name, value in (attributes or {}).items():
+        spec.attribute(name, value)
+    if tile_size > 0:
+        spec.tile_width = spec.tile_height = tile_size
+
+    output = oiio.ImageOutput.create(image_path)
+    if output is None:
+        raise IOError(f"Cannot create {image_path}: {oiio.geterror()}")
+    try:
+        if not output.open(image_path, spec):
+            raise IOError(f"Cannot open {image_path}: {output.geterror()}")
+        if not output.write_image(np.ascontiguousarray(pixels)):
+            raise IOError(f"Failed to write {image_path}: {output.geterror()}")
+    finally:
+        output.close()
+
+
+def array_to_image(pixels: np.ndarray) -> Image.Image:
+    """Quantize a float (H, W, 3) array to an 8-bit RGB PIL image."""
+    pixels = np.clip(pixels, 0.0, 1.0) * 255.0 + 0.5
+    return Image.fromarray(pixels.astype(np.uint8), 'RGB')
+
+
+def verify_backend_parity(input_path: str, source_colorspace: str, asc_sop: str, asc_sat: str,
+                          config_template_path: str, lut_dir: str,
+                          backend: str = "auto", tolerance: float = 2.0 / 255.0) -> Dict:
+    """Compare an in-process backend against oiiotool on one image.
+
+    Returns a dict with max/mean absolute error and whether the result is within tolerance.
+    """
+    engine = ColorEngine(config_template_path, lut_dir, backend=backend)
+    if not engine.in_process:
+        raise ValueError("Parity check needs an in-process backend")
+
+    in_process = engine.apply(load_image_array(input_path), source_colorspace, asc_sop, asc_sat)
+
+    cdl_path = create_cdl_file(asc_sop, asc_sat, use_cache=True)
+    ocio_config_path = get_ocio_config_cache().get_config_path(
+        config_template_path, cdl_path, os.path.abspath(lut_dir)
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        reference_path = os.path.join(temp_dir, "reference.tif")
+        cmd = [
+            "oiiotool", input_path,
+            "--colorconvert", source_colorspace, OUTPUT_COLORSPACE,
+            "-d", "float", "-o", reference_path
+        ]
+        env = dict(os.environ, OCIO=ocio_config_path)
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise RuntimeError(f"oiiotool reference render failed: {result.stderr}")
+
+        reference = load_image_array(reference_path)
+
+    error = np.abs(np.clip(in_process, 0, 1) - np.clip(reference, 0, 1))
+    report = {
+        'backend': engine.backend,
+        'max_error': float(error.max()),
+        'mean_error': float(error.mean()),
+        'tolerance': tolerance,
+        'passed': bool(error.max() <= tolerance)
+    }
+    logger.info(f"Parity {engine.backend} vs oiiotool: max={report['max_error']:.6f} "
+                f"mean={report['mean_error']:.6f} ({'PASS' if report['passed'] else 'FAIL'})")
+    return report
@@ -0,0 +1,120 @@
+# compositor.py - Output canvas buffer with bounding-box overlay compositing
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class Canvas:
+    """The output frame as a preallocated NumPy buffer that overlays are blended into.
+
+    The letterboxed picture is quantized straight into the buffer, and every
+    overlay layer touches only its own bounding box, so compositing costs scale
+    with overlay area rather than frame size. With deep=True a 16-bit buffer is
+    kept alongside the 8-bit one: pixels an overlay changes are copied into it,
+    every other pixel keeps the full-precision picture.
+    """
+
+    def __init__(self, width: int, height: int, deep: bool = False):
+        # np.zeros maps zeroed pages lazily, so the letterbox costs nothing to clear
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.deep = np.zeros((height, width, 3), dtype=np.uint16) if deep else None
+        self.image_bounds: Optional[Dict] = None
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def place(self, picture: np.ndarray, x: int = 0) -> Dict:
+        """Center a resized picture vertically, returning its visible bounds.
+
+        Float pictures (0-1) are quantized directly into the buffers; 8-bit ones
+        are copied. A picture larger than the canvas is cropped to it, like
+        Image.paste, and the bounds describe only the part that landed on it.
+        """
+        height, width = picture.shape[:2]
+        y = (self.height - height) // 2
+        boxes = self._clip_box(x, y, width, height)
+        if boxes is None:
+            self.image_bounds = {'x': 0, 'y': 0, 'width': 0, 'height': 0}
+            return self.image_bounds
+        canvas_box, picture_box = boxes
+        picture = picture[picture_box]
+
+        if picture.dtype == np.uint8:
+            self.pixels[canvas_box] = picture
+        else:
+            clipped = np.clip(picture, 0.0, 1.0)
+            self.pixels[canvas_box] = clipped * 255.0 + 0.5
+            if self.deep is not None:
+                self.deep[canvas_box] = clipped * 65535.0 + 0.5
+
+        rows, columns = canvas_box
+        self.image_bounds = {'x': columns.start, 'y': rows.start,
+                             'width': columns.stop - columns.start, 'height': rows.stop - rows.start}
+        return self.image_bounds
+
+    def _clip_box(self, x: int, y: int, width: int, height: int):
+        """Canvas and source slices of a box, clipped to the canvas (None if outside)."""
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.width), min(y + height, self.height)
+        if right <= left or bottom <= top:
+            return None
+        return ((slice(top, bottom), slice(left, right)),
+                (slice(top - y, bottom - y), slice(left - x, right - x)))
+
+    def _store(self, canvas_box, region: np.ndarray, result: np.ndarray):
+        if self.deep is not None:
+            changed = np.any(result != region, axis=-1)
+            self.deep[canvas_box][changed] = result[changed].astype(np.uint16) * 257
+        region[...] = result
+
+    def blend(self, x: int, y: int, premultiplied: np.ndarray, inverse_alpha: np.ndarray):
+        """Composite a premultiplied layer 'over' the box at (x, y).
+
+        premultiplied is uint32 (h, w, 3) color times alpha, inverse_alpha is
+        uint32 (h, w, 1) 255 - alpha.
+        """
+        boxes = self._clip_box(x, y, premultiplied.shape[1], premultiplied.shape[0])
+        if boxes is None:
+            return
+        canvas_box, layer_box = boxes
+        region = self.pixels[canvas_box]
+        result = (region * inverse_alpha[layer_box] + premultiplied[layer_box] + 127) // 255
+        self._store(canvas_box, region, result.astype(np.uint8))
+
+    def paste(self, x: int, y: int, pixels: np.ndarray):
+        """Copy opaque 8-bit RGB pixels into the box at (x, y)."""
+        boxes = self._clip_box(x, y, pixels.shape[1], pixels.shape[0])
+        if boxes is None:
+            return
+        canvas_box, layer_box = boxes
+        self._store(canvas_box, self.pixels[canvas_box], pixels[layer_box])
+
+    def copy(self) -> 'Canvas':
+        canvas = Canvas.__new__(Canvas)
+        canvas.pixels = self.pixels.copy()
+        canvas.deep = None if self.deep is None else self.deep.copy()
+        canvas.image_bounds = None if self.image_bounds is None else dict(self.image_bounds)
+        return canvas
+
+    def to_image(self) -> Image.Image:
+        """The 8-bit canvas as a PIL image (a copy)."""
+        return Image.fromarray(self.pixels, 'RGB')
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> 'Canvas':
+        canvas = cls(image.width, image.height)
+        canvas.pixels[...] = np.asarray(image.convert('RGB'))
+        return canvas
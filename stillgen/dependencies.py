@@ -13,7 +13,8 @@ logger = logging.getLogger(__name__)
 class DependencyChecker:
     """Check and manage system dependencies."""
     
-    def __init__(self):
+    def __init__(self, require_oiiotool: bool = True):
+        self.require_oiiotool = require_oiiotool
         self.python_version = sys.version_info
         self.platform = platform.system()
         self.issues = []
@@ -32,6 +33,9 @@ class DependencyChecker:
         # Check oiiotool
         self._check_oiiotool()
         
+        # Check in-process color engine
+        self._check_color_engine()
+        
         # Check required files
         self._check_required_files()
         
@@ -98,9 +102,19 @@ class DependencyChecker:
                 logger.info("✓ OpenImageIO (oiiotool) found")
         else:
             install_cmd = self._get_oiiotool_install_command()
-            self.issues.append(
-                f"OpenImageIO (oiiotool) not found. Install with: {install_cmd}"
-            )
+            message = f"OpenImageIO (oiiotool) not found. Install with: {install_cmd}"
+            if self.require_oiiotool:
+                self.issues.append(message)
+            else:
+                self.warnings.append(message)
+    
+    def _check_color_engine(self):
+        """Report which in-process color engine is available."""
+        try:
+            import PyOpenColorIO
+            logger.info(f"✓ PyOpenColorIO - {PyOpenColorIO.__version__}")
+        except ImportError:
+            logger.info("✓ NumPy color engine (PyOpenColorIO not installed)")
     
     def _get_oiiotool_install_command(self) -> str:
         """Get platform-specific oiiotool installation command."""
@@ -176,9 +190,9 @@ class DependencyChecker:
             )
 
 
-def check_dependencies():
+def check_dependencies(require_oiiotool: bool = True):
     """Main function to check all dependencies."""
-    checker = DependencyChecker()
+    checker = DependencyChecker(require_oiiotool=require_oiiotool)
     return checker.check_all()
 
 
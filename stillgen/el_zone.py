@@ -5,6 +5,8 @@ import logging
 from typing import Optional, Tuple, Union, Callable
 import math
 
+from .resources import get_registry
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -48,6 +50,12 @@ COLOR_LIST_8BIT = [
 GRAY18 = 0.18  # 18% gray in linear light
 EXP_RANGE = 7  # Maximum exposure range
 
+# Code values of the integer-indexed decode tables (16-bit)
+CODE_MAX = 65535
+
+# BT.2020 luminance weights
+BT2020_WEIGHTS = (0.2627, 0.6780, 0.0593)
+
 
 class ELZoneProcessor:
     """EL Zone System processor with vectorscope and histogram generation."""
@@ -66,6 +74,75 @@ class ELZoneProcessor:
         self.color_list_8bit = np.array(COLOR_LIST_8BIT)
         self.color_list_linear = self._srgb_eotf(self.color_list_8bit / 255.0)
         self.color_list_display = self.color_list_linear ** (1/2.4)  # Apply gamma for display
+        
+        # Zone lookup: sorted luminance edges, with black below the first and above the last;
+        # per-channel 16-bit code -> weighted linear luminance, so the map costs three lookups.
+        # Built once per log format and worker, shared read-only by every processor
+        self.zone_edges, self.zone_palette, self.luma_luts = get_registry().el_zone_tables.get(
+            log_format, self._build_tables)
+    
+    def _build_tables(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tables = self._build_zone_tables() + (self._build_luma_luts(),)
+        for table in tables:
+            table.setflags(write=False)
+        return tables
+    
+    def _build_zone_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Zone boundaries in linear luminance and the matching display colors."""
+        edges = []
+        for idx, stops in enumerate(STOPS_LIST):
+            if stops == -EXP_RANGE:
+                edges.append(-20)  # Extend to very dark
+            else:
+                edges.append(stops - (STOPS_LIST[idx] - STOPS_LIST[idx - 1]) / 2)
+        edges.append(20)  # Extend to very bright
+        edges = (GRAY18 * np.power(2.0, edges)).astype(np.float32)
+        
+        black = np.zeros((1, 3), dtype=np.float32)
+        palette = np.concatenate([black, self.color_list_display.astype(np.float32), black])
+        return edges, palette
+    
+    def _build_luma_luts(self) -> np.ndarray:
+        """(3, CODE_MAX + 1) tables of decoded linear value times each channel's luminance weight."""
+        codes = np.arange(CODE_MAX + 1, dtype=np.float64) / CODE_MAX
+        linear = codes if self.decode_func is None else np.asarray(self.decode_func(codes), dtype=np.float64)
+        return np.stack([linear * weight for weight in BT2020_WEIGHTS]).astype(np.float32)
+    
+    @staticmethod
+    def _to_float_rgb(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """Normalize a PIL image or a uint8/uint16/float array to float32 RGB in 0-1.
+        
+        Float arrays are taken as already normalized.
+        """
+        if isinstance(image, Image.Image):
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            return np.asarray(image, dtype=np.float32) / 255.0
+        
+        if image.dtype == np.uint8:
+            img_array = image.astype(np.float32) / 255.0
+        elif image.dtype == np.uint16:
+            img_array = image.astype(np.float32) / 65535.0
+        else:
+            img_array = image.astype(np.float32, copy=False)
+        # Handle RGBA arrays
+        return img_array[..., :3]
+    
+    @staticmethod
+    def _to_codes(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """16-bit code values of a PIL image or a uint8/uint16/float (0-1) array."""
+        if isinstance(image, Image.Image):
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            image = np.asarray(image)
+        
+        image = image[..., :3]
+        if image.dtype == np.uint16:
+            return image
+        if image.dtype == np.uint8:
+            return image.astype(np.uint16) * 257
+        codes = np.clip(image, 0.0, 1.0) * CODE_MAX + 0.5
+        return codes.astype(np.uint16)
     
     def _get_decode_function(self, log_format: str) -> Optional[Callable]:
         """Get the appropriate log decoding function."""
@@ -147,36 +224,10 @@ class ELZoneProcessor:
         return y
     
     def map_luminance_to_zones(self, linear_y: np.ndarray) -> np.ndarray:
-        """Map linear luminance values to EL Zone colors."""
-        out_colors = np.zeros(linear_y.shape + (3,), dtype=np.float32)
-        
-        for idx, stops in enumerate(STOPS_LIST):
-            # Calculate zone boundaries
-            if stops == -EXP_RANGE:
-                upper_diff = STOPS_LIST[idx + 1] - STOPS_LIST[idx]
-                high_stops = stops + upper_diff / 2
-                low_stops = -20  # Extend to very dark
-            elif stops == EXP_RANGE:
-                lower_diff = STOPS_LIST[idx] - STOPS_LIST[idx - 1]
-                high_stops = 20  # Extend to very bright
-                low_stops = stops - lower_diff / 2
-            else:
-                upper_diff = STOPS_LIST[idx + 1] - STOPS_LIST[idx]
-                lower_diff = STOPS_LIST[idx] - STOPS_LIST[idx - 1]
-                high_stops = stops + upper_diff / 2
-                low_stops = stops - lower_diff / 2
-            
-            # Convert stops to linear values
-            low_value = GRAY18 * (2 ** low_stops)
-            high_value = GRAY18 * (2 ** high_stops)
-            
-            # Create mask for this zone
-            zone_mask = (low_value <= linear_y) & (linear_y < high_value)
-            
-            # Apply color to masked pixels
-            out_colors[zone_mask] = self.color_list_display[idx]
-        
-        return out_colors
+        """Map linear luminance values to EL Zone colors (black outside the zone range)."""
+        # Zones are contiguous, so one binary search finds each pixel's zone
+        zone_index = np.searchsorted(self.zone_edges, linear_y, side='right')
+        return self.zone_palette[zone_index]
     
     def create_el_zone_map(self, image: Union[Image.Image, np.ndarray]) -> np.ndarray:
         """
@@ -188,27 +239,11 @@ class ELZoneProcessor:
         Returns:
             EL Zone mapped image as numpy array (0-1 range)
         """
-        # Convert to numpy array if PIL Image
-        if isinstance(image, Image.Image):
-            if image.mode == 'RGBA':
-                image = image.convert('RGB')
-            img_array = np.array(image, dtype=np.float32) / 255.0
-        else:
-            img_array = image.astype(np.float32)
-            if img_array.max() > 1.0:
-                img_array = img_array / 255.0
-            # Handle RGBA arrays
-            if img_array.shape[-1] == 4:
-                img_array = img_array[..., :3]
-        
-        # Decode from log to linear if needed
-        if self.decode_func is not None:
-            linear_image = self.decode_func(img_array)
-        else:
-            linear_image = img_array.copy()
-        
-        # Calculate luminance using BT.2020 weights
-        linear_y = self.rgb_to_y_bt2020(linear_image)
+        # Log decode and BT.2020 luminance come from per-channel 16-bit tables
+        codes = self._to_codes(image)
+        linear_y = self.luma_luts[0][codes[..., 0]]
+        linear_y += self.luma_luts[1][codes[..., 1]]
+        linear_y += self.luma_luts[2][codes[..., 2]]
         
         # Map luminance to zone colors
         el_zone_image = self.map_luminance_to_zones(linear_y)
@@ -275,17 +310,7 @@ class ELZoneProcessor:
             Vectorscope image as numpy array
         """
         # Convert to numpy array
-        if isinstance(image, Image.Image):
-            if image.mode == 'RGBA':
-                image = image.convert('RGB')
-            img_array = np.array(image, dtype=np.float32) / 255.0
-        else:
-            img_array = image.astype(np.float32)
-            if img_array.max() > 1.0:
-                img_array = img_array / 255.0
-            # Handle RGBA arrays
-            if img_array.shape[-1] == 4:
-                img_array = img_array[..., :3]
+        img_array = self._to_float_rgb(image)
         
         # Use log image data directly for vectorscope (for consistency with waveform)
         log_image = img_array.copy()
@@ -411,17 +436,7 @@ class ELZoneProcessor:
             Waveform image as numpy array
         """
         # Convert to numpy array
-        if isinstance(image, Image.Image):
-            if image.mode == 'RGBA':
-                image = image.convert('RGB')
-            img_array = np.array(image, dtype=np.float32) / 255.0
-        else:
-            img_array = image.astype(np.float32)
-            if img_array.max() > 1.0:
-                img_array = img_array / 255.0
-            # Handle RGBA arrays
-            if img_array.shape[-1] == 4:
-                img_array = img_array[..., :3]
+        img_array = self._to_float_rgb(image)
         
         # Use LOG image data directly for waveform (not linear)
         log_image = img_array.copy()
@@ -533,17 +548,7 @@ class ELZoneProcessor:
         output = np.zeros((output_size[1], output_size[0], 3), dtype=np.float32)
         
         # Convert original image to numpy if needed
-        if isinstance(original_image, Image.Image):
-            if original_image.mode == 'RGBA':
-                original_image = original_image.convert('RGB')
-            orig_array = np.array(original_image, dtype=np.float32) / 255.0
-        else:
-            orig_array = original_image.astype(np.float32)
-            if orig_array.max() > 1.0:
-                orig_array = orig_array / 255.0
-            # Handle RGBA arrays
-            if orig_array.shape[-1] == 4:
-                orig_array = orig_array[..., :3]
+        orig_array = self._to_float_rgb(original_image)
         
         # Resize top images to fill width while maintaining aspect ratio
         orig_resized = self._resize_to_fill_width(orig_array, (quad_width, quad_height))
@@ -680,21 +685,23 @@ class ELZoneProcessor:
         
         return np.array(pil_output, dtype=np.float32) / 255.0
     
-    def process_image(self, image: Union[Image.Image, str],
+    def process_image(self, image: Union[Image.Image, np.ndarray, str],
                      output_size: Tuple[int, int] = (1920, 1080)) -> np.ndarray:
         """
         Process image with complete EL Zone System workflow.
         
         Args:
-            image: Input image (PIL Image or path)
+            image: Input image (PIL Image, numpy array or path)
             output_size: Final output size
             
         Returns:
             Complete 4-quadrant analysis image
         """
-        # Load image if path provided
+        # Load image if path provided (full precision; PIL would truncate 16-bit TIFFs)
         if isinstance(image, str):
-            image = Image.open(image)
+            from .streaming import StripReader
+            with StripReader(image) as reader:
+                image = reader.read_rows(0, reader.height)
         
         logger.info(f"Processing image with EL Zone System (log format: {self.log_format})")
         
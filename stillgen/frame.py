@@ -0,0 +1,65 @@
+# frame.py - Per-still decoded frame shared across processing stages
+import logging
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+import numpy as np
+
+from .streaming import StripReader
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrameContext:
+    """Source pixels of one still, decoded once and shared by every stage.
+
+    pixels holds either the whole frame or just the crop window; crop and full
+    are views into it, never copies. Stages must treat them as read-only.
+    """
+    image_path: str
+    width: int
+    height: int
+    crop_box: Tuple[int, int, int, int]
+    pixels: np.ndarray
+    origin: Tuple[int, int] = (0, 0)  # (x, y) of pixels[0, 0] in the frame
+
+    @classmethod
+    def load(cls, image_path: str,
+             get_crop_box: Callable[[int, int], Tuple[int, int, int, int]],
+             full_frame: bool = False) -> 'FrameContext':
+        """Decode a still as float32 RGB.
+
+        Args:
+            image_path: Source image
+            get_crop_box: Returns (left, top, right, bottom) for a (width, height) frame
+            full_frame: Decode the whole frame (a stage needs it); otherwise only the crop
+        """
+        with StripReader(image_path) as reader:
+            crop_box = get_crop_box(reader.width, reader.height)
+            left, top, right, bottom = crop_box
+            if full_frame:
+                pixels = reader.read_rows(0, reader.height)
+                origin = (0, 0)
+            else:
+                pixels = reader.read_rows(top, bottom, left, right)
+                origin = (left, top)
+            width, height = reader.width, reader.height
+
+        pixels.setflags(write=False)
+        logger.debug(f"Decoded {image_path}: {pixels.shape[1]}x{pixels.shape[0]} at {origin}")
+        return cls(image_path, width, height, crop_box, pixels, origin)
+
+    @property
+    def crop(self) -> np.ndarray:
+        """The crop window as a view of the decoded pixels."""
+        left, top, right, bottom = self.crop_box
+        x, y = self.origin
+        return self.pixels[top - y:bottom - y, left - x:right - x]
+
+    @property
+    def full(self) -> np.ndarray:
+        """The whole frame; only available when it was decoded."""
+        if self.pixels.shape[:2] != (self.height, self.width):
+            raise ValueError(f"Full frame of {self.image_path} was not decoded")
+        return self.pixels
@@ -0,0 +1,233 @@
+# glyphs.py - Glyph-atlas text rendering for overlay strings
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .resources import get_registry
+
+logger = logging.getLogger(__name__)
+
+# ImageDraw's default gap between lines of multiline text
+LINE_SPACING = 4
+
+# Glyph masks render with this much margin around their bounding box
+GLYPH_PADDING = 2
+
+# Overlay-like strings for check_parity: multiline, blank lines, kerning pairs, non-ASCII
+PARITY_SAMPLES = [
+    "Look Name: 103_F\nISO: 800",
+    "Shutter Angle: 172.8° @ 24fps\nSensor FPS: 24",
+    "Camera Tilt/Roll: -1.3, 0.4\nExtraction: ARRI 4.6K 16:9",
+    "Tape: A004C001_250522_074531_h1CBB\n\nTimecode: 09:26:17:00",
+    "Director: Jane Doe\n \nCinematographer: Sam Roe",
+    "Focus Distance: 2.37m\nAperture: T2.8", "ffj AV To Wa fi", " ", "",
+]
+
+# Fonts already reported as drawing without the atlas
+_unsupported_fonts = set()
+
+
+def _blend_over(target: np.ndarray, source: np.ndarray):
+    """Combine overlapping coverage like FreeType rendering in Pillow: a + b - a*b/255 (rounded)."""
+    product = target.astype(np.uint32) * source + 128
+    target += source - ((product + (product >> 8)) >> 8).astype(np.uint8)
+
+
+class GlyphAtlas:
+    """Per-font cache of rasterized glyphs, advances and kerning.
+
+    Strings are composed by blitting cached glyph masks at their pen positions,
+    and measured from cached advances, so FreeType only sees each character (and
+    each character pair, for kerning) once. Output matches ImageDraw.text with
+    the basic layout engine pixel for pixel; see check_parity().
+    """
+
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self.font = font
+        self._glyphs: Dict[str, Tuple[np.ndarray, int, int]] = {}  # char -> (mask, dx, dy)
+        self._bboxes: Dict[str, Tuple[int, int, int, int]] = {}
+        self._advances: Dict[str, int] = {}
+        self._kerning: Dict[str, int] = {}
+        self._line_spacing = font.getbbox("A")[3] + LINE_SPACING
+
+    @staticmethod
+    def supports(font) -> bool:
+        """Whether a font's layout can be reproduced glyph by glyph.
+
+        Complex shaping (Raqm: ligatures, contextual forms) needs whole-string layout.
+        """
+        return isinstance(font, ImageFont.FreeTypeFont) and font.layout_engine == ImageFont.Layout.BASIC
+
+    def _glyph(self, char: str) -> Tuple[np.ndarray, int, int]:
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            left, top, right, bottom = self._bbox(char)
+            pad = GLYPH_PADDING
+            canvas = Image.new('L', (right - left + 2 * pad, bottom - top + 2 * pad), 0)
+            ImageDraw.Draw(canvas).text((pad - left, pad - top), char, font=self.font, fill=255)
+            mask = np.asarray(canvas)
+            glyph = (mask, left - pad, top - pad)
+            self._glyphs[char] = glyph
+        return glyph
+
+    def _bbox(self, char: str) -> Tuple[int, int, int, int]:
+        bbox = self._bboxes.get(char)
+        if bbox is None:
+            bbox = tuple(int(value) for value in self.font.getbbox(char))
+            self._bboxes[char] = bbox
+        return bbox
+
+    def _advance(self, char: str) -> int:
+        advance = self._advances.get(char)
+        if advance is None:
+            length = self.font.getlength(char)
+            if length != int(length):
+                raise ValueError(f"Fractional advance for {char!r}; glyph layout would not match FreeType")
+            advance = self._advances[char] = int(length)
+        return advance
+
+    def _pen_positions(self, line: str) -> Tuple[List[int], int]:
+        """Pen x of every character, and the pen after the last one."""
+        positions = []
+        pen = 0
+        previous = None
+        for char in line:
+            if previous is not None:
+                pair = previous + char
+                kerning = self._kerning.get(pair)
+                if kerning is None:
+                    kerning = int(self.font.getlength(pair)) - self._advance(previous) - self._advance(char)
+                    self._kerning[pair] = kerning
+                pen += kerning
+            positions.append(pen)
+            pen += self._advance(char)
+            previous = char
+        return positions, pen
+
+    def _line_bbox(self, line: str, positions: List[int]) -> Tuple[int, int, int, int]:
+        if not line:
+            return (0, 0, 0, 0)
+        boxes = [self._bbox(char) for char in line]
+        return (min(x + box[0] for x, box in zip(positions, boxes)),
+                min(box[1] for box in boxes),
+                max(x + box[2] for x, box in zip(positions, boxes)),
+                max(box[3] for box in boxes))
+
+    def getlength(self, line: str) -> int:
+        """Advance width of a single line, like FreeTypeFont.getlength."""
+        return self._pen_positions(line)[1]
+
+    def textbbox(self, xy: Tuple[int, int], text: str) -> Tuple[int, int, int, int]:
+        """Bounding box of (multiline) text drawn at xy, like ImageDraw.textbbox."""
+        bbox = None
+        for i, line in enumerate(text.split("\n")):
+            left, top, right, bottom = self._line_bbox(line, self._pen_positions(line)[0])
+            y = i * self._line_spacing
+            line_bbox = (left, top + y, right, bottom + y)
+            bbox = line_bbox if bbox is None else (min(bbox[0], line_bbox[0]), min(bbox[1], line_bbox[1]),
+                                                   max(bbox[2], line_bbox[2]), max(bbox[3], line_bbox[3]))
+        return (bbox[0] + xy[0], bbox[1] + xy[1], bbox[2] + xy[0], bbox[3] + xy[1])
+
+    def render(self, text: str) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+        """Coverage mask of (multiline) text and its offset from the draw position.
+
+        Returns (None, (0, 0)) for text without ink.
+        """
+        lines = text.split("\n")
+        layouts = [self._pen_positions(line)[0] for line in lines]
+        left, top, right, bottom = self.textbbox((0, 0), text)
+        left -= GLYPH_PADDING
+        top -= GLYPH_PADDING
+        mask = np.zeros((bottom - top + GLYPH_PADDING, right - left + GLYPH_PADDING), dtype=np.uint8)
+
+        for i, (line, positions) in enumerate(zip(lines, layouts)):
+            y = i * self._line_spacing - top
+            for char, pen in zip(line, positions):
+                glyph, dx, dy = self._glyph(char)
+                x0, y0 = pen + dx - left, y + dy
+                _blend_over(mask[y0:y0 + glyph.shape[0], x0:x0 + glyph.shape[1]], glyph)
+
+        if not mask.any():
+            return None, (0, 0)
+        return mask, (left, top)
+
+
+def get_atlas(font) -> Optional[GlyphAtlas]:
+    """The worker's shared atlas for a font, or None if the font needs ImageDraw's own layout."""
+    if not GlyphAtlas.supports(font):
+        key = (getattr(font, 'path', None), getattr(font, 'size', None))
+        if key not in _unsupported_fonts:
+            _unsupported_fonts.add(key)
+            logger.info(f"Glyph atlas disabled for font {key[0]} (size {key[1]}); text is laid out by ImageDraw")
+        return None
+    return get_registry().glyph_atlases.get((font.path, font.size), lambda: GlyphAtlas(font))
+
+
+def text_width(font, text: str) -> int:
+    """Width of text's bounding box, as ImageDraw.textbbox would report it."""
+    atlas = get_atlas(font)
+    if atlas is not None:
+        try:
+            bbox = atlas.textbbox((0, 0), text)
+            return bbox[2] - bbox[0]
+        except ValueError as e:
+            logger.debug(f"Measuring with ImageDraw: {e}")
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0]
+
+
+def render_text_mask(font, xy: Tuple[int, int], text: str) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+    """Coverage mask of text drawn at integer xy, and the mask's top-left position."""
+    atlas = get_atlas(font)
+    if atlas is not None:
+        try:
+            mask, (left, top) = atlas.render(text)
+            return mask, (xy[0] + left, xy[1] + top)
+        except ValueError as e:
+            logger.debug(f"Rendering with ImageDraw: {e}")
+
+    draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+    left, top, right, bottom = (int(v) for v in draw.textbbox(xy, text, font=font))
+    if right <= left or bottom <= top:
+        return None, (0, 0)
+    canvas = Image.new('L', (right - left, bottom - top), 0)
+    ImageDraw.Draw(canvas).text((xy[0] - left, xy[1] - top), text, font=font, fill=255)
+    return np.asarray(canvas), (left, top)
+
+
+def check_parity(font_path: str, sizes: List[int], texts: List[str]) -> int:
+    """Compare atlas text against ImageDraw.text and textbbox; return the number of mismatches."""
+    mismatches = 0
+    for size in sizes:
+        font = ImageFont.truetype(font_path, size, layout_engine=ImageFont.Layout.BASIC)
+        for text in texts:
+            reference = Image.new('L', (size * (len(text) + 4), size * (text.count("\n") + 4)), 0)
+            draw = ImageDraw.Draw(reference)
+            xy = (size, size)
+            draw.text(xy, text, font=font, fill=255)
+
+            mask, (left, top) = render_text_mask(font, xy, text)
+            composed = np.zeros((reference.height, reference.width), dtype=np.uint8)
+            if mask is not None:
+                composed[top:top + mask.shape[0], left:left + mask.shape[1]] = mask
+
+            expected_width = draw.textbbox((0, 0), text, font=font)
+            expected_width = expected_width[2] - expected_width[0]
+            if not np.array_equal(composed, np.asarray(reference)) or text_width(font, text) != expected_width:
+                logger.error(f"Glyph atlas mismatch at size {size}: {text!r}")
+                mismatches += 1
+    return mismatches
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    default_font = os.path.join(os.path.dirname(__file__), "static", "fonts", "monarcha-regular.ttf")
+    font_path = sys.argv[1] if len(sys.argv) > 1 else default_font
+    failed = check_parity(font_path, [12, 25, 37, 50, 80], PARITY_SAMPLES)
+    print(f"{failed} mismatches" if failed else "Glyph atlas matches ImageDraw")
+    sys.exit(1 if failed else 0)
@@ -1,19 +1,32 @@
 # image_processor.py - Core image processing logic
 import os
 import subprocess
+import tempfile
 from PIL import Image
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 import logging
 
-from .cdl import create_cdl_file, update_ocio_config, ColorspaceDetector, TempFileManager
+from .cdl import (create_cdl_file, update_ocio_config, get_ocio_config_cache,
+                  ColorspaceDetector, TempFileManager)
+from .color_engine import HAS_OIIO, ColorEngine, array_to_image
 from .overlay import OverlayGenerator
 from .utils import extract_clip_info, generate_output_filename
 from .parsers import LazyCSVLoader, parse_extraction_info, calculate_crop_from_extraction
 from .el_zone import ELZoneProcessor
+from .streaming import StripReader, stream_transform_resize
+from .frame import FrameContext
+from .resample import resize_image
+from .compositor import Canvas
+from .outputs import parse_output_specs, scale_config, derive_canvas, save_output
+from .writer import TiffOptions, BackgroundWriter, write_tiff, write_jpeg
+from .prefetch import Prefetcher
 
 logger = logging.getLogger(__name__)
 
+# The EL Zone overlay is computed from the crop decimated to this many times its width
+EL_ZONE_SOURCE_OVERSAMPLE = 2
+
 
 class StillProcessor:
     """Handles the core image processing pipeline."""
@@ -24,6 +37,21 @@ class StillProcessor:
         self.silverstack_data = silverstack_data
         self.csv_loader = csv_loader
         self.overlay_generator = OverlayGenerator(config)
+        
+        # Outputs are encoded and written behind the compute path (TIFFs with the profile's codec)
+        self.tiff_options = TiffOptions.from_config(config)
+        self.writer = BackgroundWriter(
+            threads=getattr(config, 'writer_threads', 2),
+            max_pending=getattr(config, 'max_pending_writes', 4)
+        )
+        
+        # Extra renditions, largest first: each is derived from the next larger clean
+        # canvas (a mip chain) and gets overlays laid out for its own size
+        self.output_specs = parse_output_specs(getattr(config, 'outputs', []), config)
+        self.output_overlay_generators = [
+            OverlayGenerator(scale_config(config, spec), spec.width / config.output_width)
+            for spec in self.output_specs
+        ]
         self.colorspace_detector = ColorspaceDetector()
         
         # Initialize EL Zone processor if enabled (for separate file generation)
@@ -32,8 +60,48 @@ class StillProcessor:
             log_format = getattr(config, 'el_zone_log_format', 'logc4')
             self.el_zone_processor = ELZoneProcessor(log_format)
         
-        # Validate oiiotool is available
-        self._check_oiiotool()
+        # Color engine (in-process OCIO/NumPy, or oiiotool subprocesses)
+        self.color_engine = ColorEngine(
+            config.config_template_path,
+            config.lut_dir,
+            backend=getattr(config, 'color_backend', 'auto'),
+            bake_luts=getattr(config, 'bake_luts', False),
+            baked_lut_size=getattr(config, 'baked_lut_size', 33),
+            cache_dir=getattr(config, 'cache_dir', '.stillgen_cache'),
+            max_baked_luts=getattr(config, 'max_baked_luts', 64)
+        )
+        
+        # Preview profile: coarse baked LUT applied to a reduced-resolution decode
+        self.preview_engine = None
+        if config.profile.settings.get('color_mode') == 'preview':
+            if self.color_engine.in_process:
+                self.preview_engine = ColorEngine(
+                    config.config_template_path,
+                    config.lut_dir,
+                    backend=self.color_engine.backend,
+                    bake_luts=True,
+                    baked_lut_size=config.profile.settings.get('preview_lut_size', 17),
+                    cache_dir=getattr(config, 'cache_dir', '.stillgen_cache'),
+                    max_baked_luts=getattr(config, 'max_baked_luts', 64)
+                )
+            else:
+                logger.warning("Preview color mode needs an in-process color backend, using full oiiotool path")
+        
+        # 16-bit output keeps the graded picture at full precision (written with OpenImageIO)
+        self.output_bit_depth = getattr(config, 'output_bit_depth', 8)
+        if self.output_bit_depth == 16 and not HAS_OIIO:
+            logger.warning("16-bit output needs the OpenImageIO Python bindings, writing 8-bit TIFFs")
+            self.output_bit_depth = 8
+        
+        # Strip-streamed processing needs the color transform in this process
+        self.streaming = getattr(config, 'streaming', False)
+        if self.streaming and not self.color_engine.in_process:
+            logger.warning("Streaming needs an in-process color backend, ignoring for oiiotool")
+            self.streaming = False
+        
+        # Validate oiiotool is available when it is the selected backend
+        if not self.color_engine.in_process:
+            self._check_oiiotool()
     
     def _check_oiiotool(self):
         """Check if oiiotool is available."""
@@ -42,8 +110,13 @@ class StillProcessor:
         except subprocess.CalledProcessError:
             raise RuntimeError("oiiotool not found. Please install OpenImageIO.")
     
-    def process_image(self, input_path: str) -> bool:
-        """Process a single image file."""
+    def process_image(self, input_path: str, transformed_path: Optional[str] = None) -> bool:
+        """Process a single image file.
+        
+        Args:
+            input_path: Source TIFF
+            transformed_path: Already color-transformed TIFF (from transform_batch), if any
+        """
         temp_manager = TempFileManager()
         
         try:
@@ -68,7 +141,9 @@ class StillProcessor:
             
             # Generate output filename and path
             output_filename = generate_output_filename(ale_entry, silverstack_entry, csv_entry)
-            output_path = os.path.join(self.config.output_folder, f"{output_filename}.tiff")
+            output_base = os.path.join(self.config.output_folder, output_filename)
+            output_path = f"{output_base}.tiff"
+            rendition_paths = [spec.get_path(output_base) for spec in self.output_specs]
             
             # Generate EL Zone output path if enabled
             el_zone_output_path = None
@@ -78,76 +153,85 @@ class StillProcessor:
                 )
             
             # Skip if already processed (for resume functionality)
-            if self.config.resume and os.path.exists(output_path):
+            if (self.config.resume and os.path.exists(output_path)
+                    and all(os.path.exists(path) for path in rendition_paths)):
                 # Also check EL Zone output if enabled
                 if el_zone_output_path and not os.path.exists(el_zone_output_path):
                     # Generate EL Zone for existing processed image
-                    self._generate_el_zone_output(input_path, el_zone_output_path, ale_entry)
+                    frame = self._decode_frame(input_path, ale_entry, full_frame=True)
+                    self._generate_el_zone_output(frame, el_zone_output_path, key=input_path)
                 logger.debug(f"Skipping already processed: {output_path}")
                 return True
             
-            # Apply color transform
-            processed_image_path = self._apply_color_transform(
-                input_path, ale_entry, temp_manager
-            )
+            # Decode the source once for the stages that need it at full resolution:
+            # in-process color (crop) and the EL Zone analysis (full frame)
+            el_zone_overlay_enabled = getattr(self.config, 'el_zone_overlay', False)
+            logger.debug(f"process_image: el_zone_overlay config = {el_zone_overlay_enabled}")
             
-            if not processed_image_path:
-                return False
+            fast_path = self.preview_engine is not None or self.streaming
+            color_reads_source = (self.color_engine.in_process and not fast_path 
+                                  and not transformed_path)
+            frame = None
+            if color_reads_source or self.el_zone_processor:
+                frame = self._decode_frame(
+                    input_path, ale_entry, full_frame=self.el_zone_processor is not None
+                )
             
-            # Load and process image
-            final_image, image_bounds = self._process_image_geometry(processed_image_path, ale_entry)
+            if self.preview_engine is not None and not transformed_path:
+                # Fast preview: decimated decode of the crop, coarse baked LUT
+                canvas = self._process_image_preview(input_path, ale_entry)
+                if canvas is None:
+                    return False
+            elif self.streaming and not transformed_path:
+                # Color transform and geometry one strip at a time
+                canvas = self._process_image_streaming(input_path, ale_entry)
+                if canvas is None:
+                    return False
+            else:
+                # Apply color transform (unless a batched oiiotool run already did)
+                if transformed_path and os.path.exists(transformed_path):
+                    processed_image = transformed_path
+                else:
+                    processed_image = self._apply_color_transform(
+                        input_path, ale_entry, temp_manager, frame
+                    )
+                
+                if processed_image is None:
+                    return False
+                
+                # Load and process image (16-bit output keeps a 16-bit buffer in the canvas)
+                canvas = self._process_image_geometry(processed_image, deep=self.output_bit_depth == 16)
             
-            # Load and crop source image for EL Zone overlay if needed
-            cropped_source_image = None
-            el_zone_overlay_enabled = getattr(self.config, 'el_zone_overlay', False)
-            logger.debug(f"process_image: el_zone_overlay config = {el_zone_overlay_enabled}")
+            image_bounds = canvas.image_bounds
             
+            # EL Zone overlay reads the same crop as the main image, decimated to its size
+            cropped_source_image = None
             if el_zone_overlay_enabled:
-                try:
-                    logger.debug(f"Loading source image from: {input_path}")
-                    source_image = Image.open(input_path).convert("RGBA")
-                    
-                    # Apply the same crop as the main image (using extraction if available)
-                    width, height = source_image.size
-                    crop_params = None
-                    if ale_entry and 'Extraction' in ale_entry:
-                        extraction_info = parse_extraction_info(ale_entry['Extraction'])
-                        if extraction_info:
-                            crop_params = calculate_crop_from_extraction(extraction_info)
-                    
-                    if crop_params:
-                        left = crop_params['crop_left']
-                        right = width - crop_params['crop_right']
-                        top = crop_params['crop_top']
-                        bottom = height - crop_params['crop_bottom']
-                    else:
-                        left = self.config.crop_left
-                        right = width - self.config.crop_right
-                        top = self.config.crop_top
-                        bottom = height - self.config.crop_bottom
-                    
-                    cropped_source_image = source_image.crop((left, top, right, bottom))
-                    
-                    logger.debug(f"Source image cropped: original={source_image.size}, cropped={cropped_source_image.size}")
-                except Exception as e:
-                    logger.error(f"Failed to load source image for EL Zone overlay: {e}", exc_info=True)
-                    cropped_source_image = None
+                cropped_source_image = self._get_overlay_source(input_path, ale_entry, frame)
+            
+            # Renditions are resized from the picture before the master's overlays are drawn
+            if self.output_specs:
+                self._save_renditions(canvas, rendition_paths, ale_entry,
+                                      silverstack_entry, csv_entry, cropped_source_image,
+                                      key=input_path)
             
             # Add overlays with image bounds info
             logger.debug(f"Calling add_overlays with source_image={cropped_source_image is not None}, bounds={image_bounds}")
             self.overlay_generator.add_overlays(
-                final_image, ale_entry, silverstack_entry, csv_entry, 
+                canvas, ale_entry, silverstack_entry, csv_entry, 
                 cropped_source_image, image_bounds
             )
             
             # Save final image
-            self._save_image(final_image, output_path)
+            self._save_image(canvas, output_path, key=input_path)
             
             # Generate EL Zone output if enabled
             if self.el_zone_processor and el_zone_output_path:
-                self._generate_el_zone_output(input_path, el_zone_output_path, ale_entry)
+                self._generate_el_zone_output(frame, el_zone_output_path, key=input_path)
             
             logger.info(f"Processed: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
+            for path in rendition_paths:
+                logger.debug(f"Rendition: {os.path.basename(input_path)} -> {os.path.basename(path)}")
             if el_zone_output_path:
                 logger.info(f"EL Zone: {os.path.basename(input_path)} -> {os.path.basename(el_zone_output_path)}")
             return True
@@ -177,8 +261,14 @@ class StillProcessor:
         return None
     
     def _apply_color_transform(self, input_path: str, ale_entry: Dict, 
-                              temp_manager: TempFileManager) -> Optional[str]:
-        """Apply color transformation using OCIO and CDL."""
+                              temp_manager: TempFileManager,
+                              frame: Optional[FrameContext] = None) -> Optional[Union[str, np.ndarray]]:
+        """Apply color transformation using OCIO and CDL to the cropped frame.
+        
+        Only the crop window is decoded and transformed. Returns the transformed
+        crop as a float32 (H, W, 3) array for in-process backends, or the path of
+        the transformed (cropped) TIFF for the oiiotool backend.
+        """
         # Get CDL values
         asc_sop = ale_entry.get('ASC_SOP', '')
         asc_sat = ale_entry.get('ASC_SAT', '')
@@ -187,86 +277,89 @@ class StillProcessor:
             logger.error(f"Missing CDL values for {input_path}")
             return None
         
-        # Create CDL file
-        use_cache = self.config.profile.settings.get('use_cache', True)
-        cdl_path = create_cdl_file(asc_sop, asc_sat, use_cache=use_cache)
-        # CDL files are managed by cache or temp manager
-        if not use_cache:
-            temp_manager.add_file(cdl_path)
+        if self.color_engine.in_process:
+            if frame is None:
+                frame = self._decode_frame(input_path, ale_entry)
+            return self._apply_color_transform_in_process(frame, ale_entry, asc_sop, asc_sat)
         
-        # Update OCIO config
-        ocio_config_path = update_ocio_config(
-            self.config.config_template_path, 
-            cdl_path, 
-            self.config.lut_dir
+        return self._apply_color_transform_oiiotool(input_path, ale_entry, asc_sop, asc_sat, temp_manager)
+    
+    def _apply_color_transform_in_process(self, frame: FrameContext, ale_entry: Dict,
+                                          asc_sop: str, asc_sat: str) -> Optional[np.ndarray]:
+        """Apply the OCIO chain in memory with the color engine."""
+        clip_name = os.path.basename(frame.image_path).split('-')[0]
+        source_colorspace = self.colorspace_detector.detect_colorspace(clip_name, ale_entry)
+        
+        try:
+            # The engine writes to a new buffer, the shared frame stays untouched
+            return self.color_engine.apply(frame.crop, source_colorspace, asc_sop, asc_sat)
+        except Exception as e:
+            logger.error(f"Color transform failed: {e}")
+            return None
+    
+    def _decode_frame(self, image_path: str, ale_entry: Optional[Dict] = None,
+                      full_frame: bool = False) -> FrameContext:
+        """Decode a still once for all stages; only the crop window unless full_frame."""
+        return FrameContext.load(
+            image_path,
+            lambda width, height: self._get_crop_box(width, height, ale_entry),
+            full_frame=full_frame
         )
-        temp_manager.add_file(ocio_config_path)
+    
+    def _get_overlay_source(self, input_path: str, ale_entry: Optional[Dict] = None,
+                            frame: Optional[FrameContext] = None) -> np.ndarray:
+        """The crop decimated to about EL_ZONE_SOURCE_OVERSAMPLE times the EL Zone overlay width.
         
-        # Set OCIO environment variable
-        os.environ["OCIO"] = ocio_config_path
+        Taken from the decoded frame when there is one (a view), otherwise read with a
+        row/column step so only the sampled rows are decoded.
+        """
+        overlay_width = getattr(self.config, 'el_zone_overlay_size', 400) * EL_ZONE_SOURCE_OVERSAMPLE
+        if frame is not None:
+            crop = frame.crop
+            step = max(1, crop.shape[1] // overlay_width)
+            return crop[::step, ::step]
         
-        # Detect source colorspace and check if input LUT is needed
+        with StripReader(input_path) as reader:
+            left, top, right, bottom = self._get_crop_box(reader.width, reader.height, ale_entry)
+            step = max(1, (right - left) // overlay_width)
+            return reader.read_rows(top, bottom, left, right, step=step)
+    
+    def _oiiotool_cut_args(self, input_path: str, ale_entry: Optional[Dict] = None) -> List[str]:
+        """Return the --cut that crops a still before oiiotool's color conversion."""
+        with Image.open(input_path) as image:
+            width, height = image.size
+        left, top, right, bottom = self._get_crop_box(width, height, ale_entry)
+        return ["--cut", f"{right - left}x{bottom - top}+{left}+{top}"]
+    
+    def _apply_color_transform_oiiotool(self, input_path: str, ale_entry: Dict,
+                                        asc_sop: str, asc_sat: str,
+                                        temp_manager: TempFileManager) -> Optional[str]:
+        """Apply the OCIO chain with oiiotool subprocesses."""
+        ocio_env = self._get_oiiotool_env(asc_sop, asc_sat, temp_manager)
+        
+        # Detect source colorspace
         clip_name = os.path.basename(input_path).split('-')[0]
         source_colorspace = self.colorspace_detector.detect_colorspace(clip_name, ale_entry)
-        uses_input_lut = self.colorspace_detector.uses_input_lut(clip_name)
         
-        # Create temporary output path
-        temp_output = os.path.join(
-            os.path.dirname(input_path), 
-            f"temp_{os.path.basename(input_path)}"
+        # Write the result to a private temp file, never next to the input
+        # (01_INPUT_STILLS may be a read-only or network mount)
+        fd, temp_output = tempfile.mkstemp(
+            prefix="stillgen_", suffix=os.path.splitext(input_path)[1] or ".tiff"
         )
+        os.close(fd)
         temp_manager.add_file(temp_output)
         
         try:
-            if uses_input_lut:
-                # For U and F cameras: Apply input LUT + CDL + output LUT pipeline
-                # The REDLog3 colorspace already includes the input LUT transformation
-                # (REDLog3G10WG_to_gm5_ARRILogC4WG4.cube) as defined in the OCIO config
-                logger.debug(f"Using input LUT pipeline for camera letter: {clip_name[0]}")
-                
-                # Direct transform from source colorspace to final output
-                # This applies: input LUT -> linear -> CDL -> output LUT
-                cmd = [
-                    "oiiotool",
-                    input_path,
-                    "--colorconvert", source_colorspace, "Output_w_Look",
-                    "-o", temp_output
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    logger.error(f"Input LUT color pipeline failed: {result.stderr}")
-                    return None
-                    
-            else:
-                # Standard pipeline for other cameras: source -> linear -> CDL + output LUT
-                logger.debug(f"Using standard pipeline for camera letter: {clip_name[0]}")
-                
-                # First convert to linear
-                cmd1 = [
-                    "oiiotool",
-                    input_path,
-                    "--colorconvert", source_colorspace, "linear",
-                    "-o", temp_output
-                ]
-                
-                result = subprocess.run(cmd1, capture_output=True, text=True)
-                if result.returncode != 0:
-                    logger.error(f"Color conversion to linear failed: {result.stderr}")
-                    return None
-                
-                # Then apply CDL and LUT
-                cmd2 = [
-                    "oiiotool",
-                    temp_output,
-                    "--colorconvert", "linear", "Output_w_Look",
-                    "-o", temp_output
-                ]
-                
-                result = subprocess.run(cmd2, capture_output=True, text=True)
-                if result.returncode != 0:
-                    logger.error(f"CDL/LUT application failed: {result.stderr}")
-                    return None
+            # One fused command: both conversions run in memory with no intermediate file
+            cmd = ["oiiotool", input_path]
+            cmd += self._oiiotool_cut_args(input_path, ale_entry)
+            cmd += self._oiiotool_convert_args(clip_name, source_colorspace)
+            cmd += ["-o", temp_output]
+            
+            result = subprocess.run(cmd, capture_output=True, text=True, env=ocio_env)
+            if result.returncode != 0:
+                logger.error(f"Color pipeline failed: {result.stderr}")
+                return None
             
             return temp_output
             
@@ -274,27 +367,127 @@ class StillProcessor:
             logger.error(f"Color transform failed: {e}")
             return None
     
-    def _process_image_geometry(self, image_path: str, ale_entry: Optional[Dict] = None) -> tuple[Image.Image, dict]:
-        """Process image geometry (crop, resize, add black bars).
+    def _oiiotool_convert_args(self, clip_name: str, source_colorspace: str) -> List[str]:
+        """Return the --colorconvert chain for a clip's camera."""
+        if self.colorspace_detector.uses_input_lut(clip_name):
+            # For U and F cameras: the REDLog3 colorspace already includes the input LUT
+            # (REDLog3G10WG_to_gm5_ARRILogC4WG4.cube) as defined in the OCIO config.
+            # This applies: input LUT -> linear -> CDL -> output LUT
+            logger.debug(f"Using input LUT pipeline for camera letter: {clip_name[0]}")
+            return ["--colorconvert", source_colorspace, "Output_w_Look"]
         
-        Args:
-            image_path: Path to the image file
-            ale_entry: ALE entry containing extraction information
+        # Standard pipeline for other cameras: source -> linear -> CDL + output LUT,
+        # chained in a single oiiotool command
+        logger.debug(f"Using standard pipeline for camera letter: {clip_name[0]}")
+        return ["--colorconvert", source_colorspace, "linear",
+                "--colorconvert", "linear", "Output_w_Look"]
+    
+    def _get_oiiotool_env(self, asc_sop: str, asc_sat: str, 
+                          temp_manager: TempFileManager) -> Dict[str, str]:
+        """Build the subprocess environment pointing oiiotool at the look's OCIO config."""
+        # Create CDL file
+        use_cache = self.config.profile.settings.get('use_cache', True)
+        cdl_path = create_cdl_file(asc_sop, asc_sat, use_cache=use_cache)
+        # CDL files are managed by cache or temp manager
+        if not use_cache:
+            temp_manager.add_file(cdl_path)
         
-        Returns:
-            tuple: (processed image, image bounds dict with x, y, width, height)
+        # Update OCIO config (shared per look when caching is enabled)
+        if use_cache:
+            ocio_config_path = get_ocio_config_cache().get_config_path(
+                self.config.config_template_path,
+                cdl_path,
+                self.config.lut_dir
+            )
+        else:
+            ocio_config_path = update_ocio_config(
+                self.config.config_template_path, 
+                cdl_path, 
+                self.config.lut_dir
+            )
+            temp_manager.add_file(ocio_config_path)
+        
+        # Pass the config to oiiotool explicitly instead of mutating the process environment,
+        # so transforms can run concurrently from threads
+        return dict(os.environ, OCIO=ocio_config_path)
+    
+    def transform_batch(self, input_paths: List[str], 
+                        temp_manager: TempFileManager) -> Dict[str, str]:
+        """Color-transform stills with one oiiotool launch per (colorspace, CDL) group.
+        
+        Only active for the oiiotool backend with batch_oiiotool enabled. Returns a
+        mapping of input path -> transformed TIFF for every still that succeeded;
+        stills missing from the mapping fall back to the per-image path.
         """
-        # Load image
-        image = Image.open(image_path).convert("RGBA")
-        width, height = image.size
+        if self.color_engine.in_process or not getattr(self.config, 'batch_oiiotool', False):
+            return {}
         
+        # Group stills sharing a source colorspace and CDL
+        groups: Dict[tuple, List[tuple]] = {}
+        for input_path in input_paths:
+            clip_name, _ = extract_clip_info(input_path)
+            ale_entry = self._find_ale_entry(clip_name) if clip_name else None
+            if not ale_entry:
+                continue
+            
+            asc_sop = ale_entry.get('ASC_SOP', '')
+            asc_sat = ale_entry.get('ASC_SAT', '')
+            if not asc_sop or not asc_sat:
+                continue
+            
+            source_colorspace = self.colorspace_detector.detect_colorspace(clip_name, ale_entry)
+            groups.setdefault((source_colorspace, asc_sop, asc_sat), []).append((input_path, ale_entry))
+        
+        batch_dir = tempfile.mkdtemp(prefix="stillgen_batch_")
+        temp_manager.add_dir(batch_dir)
+        
+        transformed = {}
+        for (source_colorspace, asc_sop, asc_sat), entries in groups.items():
+            transformed.update(self._run_oiiotool_group(
+                entries, source_colorspace, asc_sop, asc_sat, batch_dir, temp_manager
+            ))
+        
+        logger.debug(f"Batched oiiotool: {len(transformed)}/{len(input_paths)} stills "
+                     f"in {len(groups)} invocations")
+        return transformed
+    
+    def _run_oiiotool_group(self, entries: List[tuple], source_colorspace: str,
+                            asc_sop: str, asc_sat: str, batch_dir: str,
+                            temp_manager: TempFileManager) -> Dict[str, str]:
+        """Run one chained oiiotool command writing each (input path, ALE entry) to its own output."""
+        ocio_env = self._get_oiiotool_env(asc_sop, asc_sat, temp_manager)
+        
+        cmd = ["oiiotool"]
+        outputs = {}
+        for index, (input_path, ale_entry) in enumerate(entries):
+            clip_name = os.path.basename(input_path).split('-')[0]
+            output_path = os.path.join(batch_dir, f"{index:04d}_{os.path.basename(input_path)}")
+            temp_manager.add_file(output_path)
+            outputs[input_path] = output_path
+            
+            # --pop drops each still after writing so the image stack stays one deep
+            cmd += ["-i", input_path]
+            cmd += self._oiiotool_cut_args(input_path, ale_entry)
+            cmd += self._oiiotool_convert_args(clip_name, source_colorspace)
+            cmd += ["-o", output_path, "--pop"]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True, env=ocio_env)
+        if result.returncode != 0:
+            logger.warning(f"Batched oiiotool run failed for {len(entries)} stills, "
+                           f"falling back to per-image transforms: {result.stderr}")
+        
+        return {path: output for path, output in outputs.items() if os.path.exists(output)}
+    
+    def _get_crop_box(self, width: int, height: int, 
+                      ale_entry: Optional[Dict] = None) -> tuple[int, int, int, int]:
+        """Return the (left, top, right, bottom) crop for a frame of the given size."""
         # Try to get crop parameters from extraction information
         crop_params = None
         if ale_entry and 'Extraction' in ale_entry:
             extraction_info = parse_extraction_info(ale_entry['Extraction'])
             if extraction_info:
                 crop_params = calculate_crop_from_extraction(extraction_info)
-                logger.debug(f"Using extraction-based cropping for {os.path.basename(image_path)}")
+                logger.debug(f"Using extraction-based cropping ({ale_entry['Extraction']})")
         
         # Use extraction-based crop if available, otherwise fall back to config
         if crop_params:
@@ -311,68 +504,199 @@ class StillProcessor:
             bottom = height - self.config.crop_bottom
             logger.debug(f"Config crop: L{left} R{self.config.crop_right} T{top} B{self.config.crop_bottom}")
         
-        # Crop image
-        image = image.crop((left, top, right, bottom))
-        
-        # Calculate new dimensions maintaining aspect ratio
+        return left, top, right, bottom
+    
+    def _get_output_size(self, crop_width: int, crop_height: int) -> tuple[int, int]:
+        """Calculate resized dimensions maintaining aspect ratio."""
         new_width = self.config.output_width
-        aspect_ratio = image.height / image.width
-        new_height = int(new_width * aspect_ratio)
-        
-        # Get resize quality based on profile
-        resize_quality = Image.Resampling.LANCZOS
+        aspect_ratio = crop_height / crop_width
+        return new_width, int(new_width * aspect_ratio)
+    
+    def _get_resize_quality(self) -> int:
+        """Get resize quality based on profile."""
         if self.config.profile.settings.get('resize_quality') == 'nearest':
-            resize_quality = Image.Resampling.NEAREST
+            return Image.Resampling.NEAREST
+        return Image.Resampling.LANCZOS
+    
+    def _resize(self, image: Image.Image, size: tuple[int, int]) -> Image.Image:
+        """Resize with the profile's filter, resize method and reducing gap."""
+        return resize_image(
+            image, size, self._get_resize_quality(),
+            method=self.config.profile.settings.get('resize_method', 'pil'),
+            threads=getattr(self.config, 'resize_threads', 0),
+            reducing_gap=self.config.profile.settings.get('reducing_gap')
+        )
+    
+    def _place_in_canvas(self, picture: Union[Image.Image, np.ndarray], deep: bool = False) -> Canvas:
+        """Center a resized picture (8-bit image or float array) vertically on a black output canvas."""
+        canvas = Canvas(self.config.output_width, self.config.output_height, deep=deep)
+        canvas.place(np.asarray(picture) if isinstance(picture, Image.Image) else picture)
+        return canvas
+    
+    def _resize_float(self, image_source: Union[str, np.ndarray]) -> np.ndarray:
+        """Resize the transformed crop in float32 to the output width.
         
-        # Resize image
-        image = image.resize((new_width, new_height), resize_quality)
+        The color stage already cropped the frame while decoding, so only the crop
+        window was ever decoded and transformed. Files are read at full precision
+        (PIL would truncate a 16-bit TIFF to 8 bits).
+        """
+        if isinstance(image_source, np.ndarray):
+            pixels = image_source
+        else:
+            with StripReader(image_source) as reader:
+                pixels = reader.read_rows(0, reader.height)
         
-        # Create black container
-        container = Image.new('RGBA', 
-                            (self.config.output_width, self.config.output_height), 
-                            (0, 0, 0, 255))
+        # PIL resamples float images one channel at a time ('F' mode)
+        height, width = pixels.shape[:2]
+        size = self._get_output_size(width, height)
+        return np.stack([
+            np.asarray(self._resize(
+                Image.fromarray(np.ascontiguousarray(pixels[..., channel], dtype=np.float32), 'F'), size))
+            for channel in range(3)
+        ], axis=-1)
+    
+    def _process_image_geometry(self, image_source: Union[str, np.ndarray], deep: bool = False) -> Canvas:
+        """Process image geometry (resize, add black bars).
         
-        # Calculate position to center the image vertically
-        y_offset = (self.config.output_height - new_height) // 2
-        container.paste(image, (0, y_offset))
+        Resizing runs in float; the result is quantized straight into the canvas
+        buffer (and kept at 16 bits next to it with deep=True).
         
-        # Return container and image bounds
-        image_bounds = {
-            'x': 0,
-            'y': y_offset,
-            'width': new_width,
-            'height': new_height
-        }
+        Args:
+            image_source: Path to the transformed crop, or the transformed crop itself
+            deep: Keep a 16-bit canvas for 16-bit output
         
-        return container, image_bounds
+        Returns:
+            Canvas with the picture placed; its image_bounds hold x, y, width, height
+        """
+        return self._place_in_canvas(self._resize_float(image_source), deep=deep)
     
-    def _save_image(self, image: Image.Image, output_path: str):
-        """Save image with appropriate quality settings."""
+    def _process_image_streaming(self, input_path: str, 
+                                 ale_entry: Dict) -> Optional[Canvas]:
+        """Crop, color transform and resize strip by strip (bounded memory).
+        
+        Equivalent to _apply_color_transform followed by _process_image_geometry
+        for in-process color backends.
+        """
+        asc_sop = ale_entry.get('ASC_SOP', '')
+        asc_sat = ale_entry.get('ASC_SAT', '')
+        if not asc_sop or not asc_sat:
+            logger.error(f"Missing CDL values for {input_path}")
+            return None
+        
+        clip_name = os.path.basename(input_path).split('-')[0]
+        source_colorspace = self.colorspace_detector.detect_colorspace(clip_name, ale_entry)
+        
+        def transform(pixels: np.ndarray) -> np.ndarray:
+            return self.color_engine.apply(pixels, source_colorspace, asc_sop, asc_sat)
+        
+        with StripReader(input_path) as reader:
+            left, top, right, bottom = self._get_crop_box(reader.width, reader.height, ale_entry)
+            image = stream_transform_resize(
+                reader, (left, top, right, bottom),
+                self._get_output_size(right - left, bottom - top),
+                transform,
+                resample=self._get_resize_quality(),
+                max_worker_memory_mb=getattr(self.config, 'max_worker_memory', 0),
+                # The canvas is built from the result, and the previous still's may still be writing
+                reserved_bytes=self.config.output_width * self.config.output_height * 3
+            )
+        
+        return self._place_in_canvas(image)
+    
+    def _process_image_preview(self, input_path: str, 
+                               ale_entry: Dict) -> Optional[Canvas]:
+        """Preview color mode: crop and decimate while decoding, then apply a coarse baked LUT.
+        
+        The crop is decoded at the largest integer reduction that keeps it at least as
+        wide as the canvas, so the picture is only ever downscaled to the output size.
+        """
+        asc_sop = ale_entry.get('ASC_SOP', '')
+        asc_sat = ale_entry.get('ASC_SAT', '')
+        if not asc_sop or not asc_sat:
+            logger.error(f"Missing CDL values for {input_path}")
+            return None
+        
+        clip_name = os.path.basename(input_path).split('-')[0]
+        source_colorspace = self.colorspace_detector.detect_colorspace(clip_name, ale_entry)
+        
+        with StripReader(input_path) as reader:
+            left, top, right, bottom = self._get_crop_box(reader.width, reader.height, ale_entry)
+            reduction = max(1, (right - left) // self.config.output_width)
+            pixels = reader.read_rows(top, bottom, left, right, step=reduction)
+        
+        pixels = self.preview_engine.apply(pixels, source_colorspace, asc_sop, asc_sat)
+        image = array_to_image(pixels)
+        image = self._resize(image, self._get_output_size(right - left, bottom - top))
+        
+        return self._place_in_canvas(image)
+    
+    def _save_image(self, canvas: Canvas, output_path: str, key: Optional[str] = None):
+        """Queue the output TIFF on the write-behind stage with the profile's codec.
+        
+        A canvas with a 16-bit buffer is written at 16 bits. The canvas may not be
+        modified afterwards; failures are reported by flush_writes().
+        """
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Save as TIFF without quality parameter (not supported for TIFF)
-        image.save(output_path, 'TIFF')
+        pixels = canvas.deep if canvas.deep is not None else canvas.pixels
+        self.writer.submit(key or output_path, output_path, write_tiff, pixels, self.tiff_options)
     
-    def _generate_el_zone_output(self, input_path: str, output_path: str, 
-                                ale_entry: Optional[Dict] = None):
-        """Generate EL Zone System analysis output."""
-        try:
-            # Load the input image
-            input_image = Image.open(input_path)
+    def flush_writes(self) -> List[str]:
+        """Wait for queued output writes; return the input paths whose output failed to write."""
+        return self.writer.flush()
+    
+    def _save_renditions(self, canvas: Canvas, output_paths: List[str],
+                         ale_entry: Dict, silverstack_entry: Optional[Dict], 
+                         csv_entry: Optional[Dict], source_image: Optional[np.ndarray] = None,
+                         key: Optional[str] = None):
+        """Write the extra outputs, each resized from the previous (larger) clean canvas.
+        
+        The master canvas must not have overlays yet; it is only read.
+        """
+        settings = self.config.profile.settings
+        # Renditions are queued before the master, which otherwise creates the folder
+        for output_path in output_paths:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        for spec, overlay_generator, output_path in zip(
+                self.output_specs, self.output_overlay_generators, output_paths):
+            canvas = derive_canvas(
+                canvas, spec, self._get_resize_quality(),
+                method=settings.get('resize_method', 'pil'),
+                threads=getattr(self.config, 'resize_threads', 0),
+                reducing_gap=settings.get('reducing_gap')
+            )
+            rendition = canvas.copy()
+            
+            # The EL Zone overlay shrinks with the canvas, so a decimated source view is enough
+            rendition_source = source_image
+            if source_image is not None:
+                step = max(1, self.config.output_width // spec.width)
+                rendition_source = source_image[::step, ::step]
             
+            overlay_generator.add_overlays(
+                rendition, ale_entry, silverstack_entry, csv_entry,
+                rendition_source, rendition.image_bounds
+            )
+            self.writer.submit(key or output_path, output_path, save_output, rendition.pixels, spec,
+                               self.tiff_options)
+    
+    def _generate_el_zone_output(self, frame: FrameContext, output_path: str,
+                                 key: Optional[str] = None):
+        """Generate EL Zone System analysis output from the full decoded frame."""
+        try:
             # Generate complete EL Zone analysis (4-quadrant layout)
             el_zone_result = self.el_zone_processor.process_image(
-                input_image, 
+                frame.full, 
                 output_size=(1920, 1080)
             )
             
             # Convert to PIL image and save as JPEG
             el_zone_pil = Image.fromarray((el_zone_result * 255).astype(np.uint8), 'RGB')
-            el_zone_pil.save(output_path, 'JPEG', quality=95, optimize=True)
+            self.writer.submit(key or output_path, output_path, write_jpeg, el_zone_pil, 95)
             
         except Exception as e:
-            logger.error(f"Failed to generate EL Zone analysis for {input_path}: {e}")
+            logger.error(f"Failed to generate EL Zone analysis for {frame.image_path}: {e}")
 
 
 class BatchProcessor:
@@ -388,12 +712,27 @@ class BatchProcessor:
     def process_batch(self, file_paths: list) -> list:
         """Process a batch of files and return results."""
         results = []
+        temp_manager = TempFileManager()
+        prefetcher = Prefetcher(file_paths, getattr(self.config, 'prefetch', 2),
+                                getattr(self.config, 'prefetch_memory', 512))
         
-        for file_path in file_paths:
-            try:
-                success = self.processor.process_image(file_path)
-                results.append((file_path, success, None))
-            except Exception as e:
-                results.append((file_path, False, str(e)))
+        try:
+            transformed = self.processor.transform_batch(file_paths, temp_manager)
+            
+            for file_path in file_paths:
+                try:
+                    success = self.processor.process_image(file_path, transformed.get(file_path))
+                    results.append((file_path, success, None))
+                except Exception as e:
+                    results.append((file_path, False, str(e)))
+                finally:
+                    prefetcher.release(file_path)
+            
+            failed = set(self.processor.flush_writes())
+            results = [(path, False, "Failed to write output") if path in failed else (path, success, error)
+                       for path, success, error in results]
+        finally:
+            prefetcher.close()
+            temp_manager.cleanup()
         
         return results
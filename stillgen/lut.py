@@ -0,0 +1,221 @@
+# lut.py - LUT file loading and application
+import os
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .utils import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Pixels per chunk for LUT application; bounds the temporaries to a few tens of MB
+DEFAULT_CHUNK_PIXELS = 1 << 18
+
+
+@dataclass(eq=False)
+class Lut3D:
+    """A 3D LUT lattice indexed as table[r, g, b] -> (R, G, B)."""
+    table: np.ndarray
+    domain_min: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    domain_max: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+
+    @property
+    def size(self) -> int:
+        return self.table.shape[0]
+
+
+def _read_cube_header(cube_path: str) -> Tuple[Optional[int], Tuple, Tuple, int]:
+    """Read size, domain and the line index where lattice data starts."""
+    size = None
+    domain_min = (0.0, 0.0, 0.0)
+    domain_max = (1.0, 1.0, 1.0)
+
+    with open(cube_path, 'r') as f:
+        for line_number, line in enumerate(f):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            keyword = line.split()[0]
+            if keyword == 'LUT_3D_SIZE':
+                size = int(line.split()[1])
+            elif keyword == 'LUT_1D_SIZE':
+                raise ValueError(f"1D .cube LUTs are not supported: {cube_path}")
+            elif keyword == 'DOMAIN_MIN':
+                domain_min = tuple(float(v) for v in line.split()[1:4])
+            elif keyword == 'DOMAIN_MAX':
+                domain_max = tuple(float(v) for v in line.split()[1:4])
+            elif keyword[0].isalpha():
+                # TITLE and vendor keywords
+                continue
+            else:
+                return size, domain_min, domain_max, line_number
+
+    return size, domain_min, domain_max, -1
+
+
+def _parse_cube(cube_path: str) -> Lut3D:
+    """Parse a .cube file's text into a [r, g, b] lattice."""
+    size, domain_min, domain_max, data_start = _read_cube_header(cube_path)
+    if size is None:
+        raise ValueError(f"Missing LUT_3D_SIZE in {cube_path}")
+
+    with open(cube_path, 'r') as f:
+        lines = f.read().splitlines()[max(data_start, 0):]
+
+    # Drop comments/blank lines, then convert the remaining text in one call
+    text = ' '.join(line for line in lines if line.strip() and not line.lstrip().startswith('#'))
+    data = np.array(text.split(), dtype=np.float32)
+    if data.size != size ** 3 * 3:
+        raise ValueError(f"Expected {size ** 3} entries in {cube_path}, found {data.size // 3}")
+
+    # .cube files store red fastest: reorder the lattice to [r, g, b]
+    table = data.reshape(size, size, size, 3).transpose(2, 1, 0, 3)
+    return Lut3D(np.ascontiguousarray(table), domain_min, domain_max)
+
+
+def _get_binary_cache_path(cube_path: str, cache_dir: str) -> str:
+    """Binary cache path keyed by the .cube file's path, size and modification time."""
+    stat = os.stat(cube_path)
+    content = f"{os.path.abspath(cube_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    key = hashlib.md5(content.encode()).hexdigest()
+    name = os.path.splitext(os.path.basename(cube_path))[0]
+    return os.path.join(cache_dir, f"{name}_{key}.npy")
+
+
+def load_cube(cube_path: str, cache_dir: Optional[str] = None) -> Lut3D:
+    """Load a Resolve/Adobe style .cube 3D LUT.
+
+    With a cache_dir the parsed lattice is persisted as a .npy file and later
+    loads memory-map it, so every run and worker shares the same pages instead
+    of re-parsing the text.
+    """
+    if not os.path.exists(cube_path):
+        raise FileNotFoundError(f"LUT file not found: {cube_path}")
+
+    if cache_dir is None:
+        return _parse_cube(cube_path)
+
+    cache_path = _get_binary_cache_path(cube_path, cache_dir)
+    if os.path.exists(cache_path):
+        try:
+            size, domain_min, domain_max, _ = _read_cube_header(cube_path)
+            table = np.load(cache_path, mmap_mode='r')
+            if table.shape == (size, size, size, 3):
+                return Lut3D(table, domain_min, domain_max)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable LUT cache {cache_path}: {e}")
+
+    lut = _parse_cube(cube_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a temporary name so concurrent workers never map a partial file
+        write_atomic(cache_path, np.save, lut.table)
+        logger.debug(f"Cached LUT lattice: {os.path.basename(cache_path)}")
+    except OSError as e:
+        logger.warning(f"Failed to cache LUT {cube_path}: {e}")
+    return lut
+
+
+def _normalized_coords(pixels: np.ndarray, lut: Lut3D) -> np.ndarray:
+    """Map pixels into lattice coordinates, clamped to the LUT domain."""
+    domain_min = np.asarray(lut.domain_min, dtype=np.float32)
+    domain_max = np.asarray(lut.domain_max, dtype=np.float32)
+    coords = (pixels - domain_min) / (domain_max - domain_min)
+    np.clip(coords, 0.0, 1.0, out=coords)
+    coords *= lut.size - 1
+    return coords
+
+
+def _tetrahedral_chunk(pixels: np.ndarray, lut: Lut3D, flat: np.ndarray,
+                       strides: np.ndarray) -> np.ndarray:
+    coords = _normalized_coords(pixels, lut)
+    base = np.minimum(coords.astype(np.int32), lut.size - 2)
+    frac = coords - base
+
+    # Walk from the lattice origin to the far corner along the largest fraction first:
+    # the tetrahedron is fixed by which channels hold the largest and smallest fractions
+    rows = np.arange(frac.shape[0])
+    largest = frac.argmax(axis=1)
+    smallest = frac.argmin(axis=1)
+    f_max = frac[rows, largest][:, np.newaxis]
+    f_min = frac[rows, smallest][:, np.newaxis]
+    f_mid = frac.sum(axis=1, keepdims=True) - f_max - f_min
+
+    index0 = base @ strides
+    index1 = index0 + strides[largest]
+    index3 = index0 + strides.sum()
+    index2 = index3 - strides[smallest]
+
+    result = flat[index0] * (1.0 - f_max)
+    result += flat[index1] * (f_max - f_mid)
+    result += flat[index2] * (f_mid - f_min)
+    result += flat[index3] * f_min
+    return result
+
+
+def _trilinear_chunk(pixels: np.ndarray, lut: Lut3D, flat: np.ndarray,
+                     strides: np.ndarray) -> np.ndarray:
+    coords = _normalized_coords(pixels, lut)
+    base = np.minimum(coords.astype(np.int32), lut.size - 2)
+    frac = coords - base
+    index0 = base @ strides
+
+    # Per-axis (low, high) weights; each corner's weight is their product
+    weights = [(1.0 - frac[:, axis:axis + 1], frac[:, axis:axis + 1]) for axis in range(3)]
+    weights_rg = [[weights[0][r] * weights[1][g] for g in (0, 1)] for r in (0, 1)]
+
+    result = np.zeros_like(pixels)
+    for r in (0, 1):
+        for g in (0, 1):
+            for b in (0, 1):
+                offset = int(r * strides[0] + g * strides[1] + b * strides[2])
+                result += flat[index0 + offset] * (weights_rg[r][g] * weights[2][b])
+    return result
+
+
+def apply_lut3d(image: np.ndarray, lut: Lut3D, interpolation: str = "tetrahedral",
+                chunk_pixels: int = DEFAULT_CHUNK_PIXELS,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply a 3D LUT to an (..., 3) float image in fixed-size pixel chunks.
+
+    Args:
+        image: Float image with RGB in the last axis
+        lut: Lattice to apply
+        interpolation: 'tetrahedral' (matches OCIO 'best') or 'trilinear'
+        chunk_pixels: Pixels processed per chunk, bounding temporary memory
+        out: Optional float32 array (may be image itself) receiving the result
+    """
+    if interpolation == "tetrahedral":
+        apply_chunk = _tetrahedral_chunk
+    elif interpolation == "trilinear":
+        apply_chunk = _trilinear_chunk
+    else:
+        raise ValueError(f"Unknown LUT interpolation: {interpolation}")
+
+    if out is None:
+        out = np.empty(image.shape, dtype=np.float32)
+
+    pixels = image.reshape(-1, 3)
+    result = out.reshape(-1, 3)
+    flat = np.asarray(lut.table).reshape(-1, 3)
+    strides = np.array([lut.size * lut.size, lut.size, 1], dtype=np.int32)
+
+    for start in range(0, pixels.shape[0], chunk_pixels):
+        chunk = pixels[start:start + chunk_pixels].astype(np.float32, copy=False)
+        result[start:start + chunk_pixels] = apply_chunk(chunk, lut, flat, strides)
+
+    return out
+
+
+def apply_lut3d_tetrahedral(image: np.ndarray, lut: Lut3D) -> np.ndarray:
+    """Apply a 3D LUT to an (..., 3) float image with tetrahedral interpolation."""
+    return apply_lut3d(image, lut, interpolation="tetrahedral")
+
+
+def apply_lut3d_trilinear(image: np.ndarray, lut: Lut3D) -> np.ndarray:
+    """Apply a 3D LUT to an (..., 3) float image with trilinear interpolation."""
+    return apply_lut3d(image, lut, interpolation="trilinear")
@@ -0,0 +1,137 @@
+# outputs.py - Extra output renditions derived from the master canvas
+import copy
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from .compositor import Canvas
+from .resample import resize_image
+from .writer import TiffOptions, write_tiff
+
+logger = logging.getLogger(__name__)
+
+# Output format -> (PIL format name, file extension)
+OUTPUT_FORMATS = {
+    "tiff": ("TIFF", "tiff"),
+    "jpeg": ("JPEG", "jpg"),
+    "png": ("PNG", "png"),
+}
+
+# Config fields measured in output pixels; scaled with the canvas so overlays keep their layout
+LAYOUT_FIELDS = [
+    "font_size_small", "font_size_medium", "font_size_large",
+    "logo_padding", "logo_max_height", "logo_spacing",
+    "text_margin", "text_y_top", "text_y_bottom",
+    "el_zone_overlay_size",
+]
+
+
+@dataclass
+class OutputSpec:
+    """One extra rendition written next to the master TIFF."""
+    width: int
+    height: int
+    format: str = "jpeg"
+    quality: int = 90
+    suffix: str = ""
+
+    @property
+    def extension(self) -> str:
+        return OUTPUT_FORMATS[self.format][1]
+
+    def get_path(self, master_path_base: str) -> str:
+        """Output path from the master's path without extension."""
+        return f"{master_path_base}{self.suffix}.{self.extension}"
+
+
+def parse_output_specs(outputs: List[Dict], config) -> List[OutputSpec]:
+    """Validate Config.outputs entries and order them largest first (the mip-chain order).
+
+    Each entry needs a width; height defaults to the master canvas aspect, format
+    to jpeg, quality to the profile's output_quality and suffix to "_<width>".
+    Entries not smaller than the master canvas are skipped.
+    """
+    specs = []
+    default_quality = config.profile.settings.get('output_quality', 90)
+    for entry in outputs or []:
+        width = int(entry['width'])
+        if width >= config.output_width:
+            logger.warning(f"Ignoring output of width {width}: renditions must be smaller than "
+                           f"the {config.output_width} px master")
+            continue
+        output_format = str(entry.get('format', 'jpeg')).lower()
+        if output_format == 'jpg':
+            output_format = 'jpeg'
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}'. "
+                             f"Choose from: {', '.join(OUTPUT_FORMATS)}")
+        height = int(entry.get('height') or round(config.output_height * width / config.output_width))
+        specs.append(OutputSpec(
+            width=width,
+            height=height,
+            format=output_format,
+            quality=int(entry.get('quality', default_quality)),
+            suffix=entry.get('suffix', f"_{width}"),
+        ))
+
+    return sorted(specs, key=lambda spec: spec.width, reverse=True)
+
+
+def scale_config(config, spec: OutputSpec):
+    """Shallow copy of config with the canvas and overlay layout scaled to spec."""
+    scale = spec.width / config.output_width
+    scaled = copy.copy(config)
+    scaled.output_width = spec.width
+    scaled.output_height = spec.height
+    for name in LAYOUT_FIELDS:
+        if hasattr(config, name):
+            setattr(scaled, name, max(1, int(round(getattr(config, name) * scale))))
+    return scaled
+
+
+def derive_canvas(canvas: Canvas, spec: OutputSpec,
+                  resample: int = Image.Resampling.LANCZOS,
+                  method: str = "pil", threads: int = 0,
+                  reducing_gap: Optional[float] = None) -> Canvas:
+    """Resize the picture area of a clean (overlay-free) canvas into a smaller canvas.
+
+    Only the picture is resampled, so the letterbox stays pure black; the picture
+    is centered vertically like the master.
+
+    Returns:
+        Canvas of spec size, with the picture's image_bounds
+    """
+    scale = spec.width / canvas.width
+    bounds = canvas.image_bounds
+    x, y = bounds['x'], bounds['y']
+    width, height = bounds['width'], bounds['height']
+
+    picture = Image.fromarray(canvas.pixels[y:y + height, x:x + width], 'RGB')
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    picture = resize_image(picture, size, resample, method=method, threads=threads,
+                           reducing_gap=reducing_gap)
+
+    derived = Canvas(spec.width, spec.height)
+    derived.place(np.asarray(picture), x=int(round(x * scale)))
+    return derived
+
+
+def save_output(output_path: str, image: Union[Image.Image, np.ndarray], spec: OutputSpec,
+                tiff_options: Optional[TiffOptions] = None):
+    """Write a rendition (PIL image or 8-bit RGB array) in its configured format.
+
+    TIFF renditions are written like the master, with tiff_options' codec.
+    """
+    pil_format = OUTPUT_FORMATS[spec.format][0]
+    if pil_format == "TIFF":
+        write_tiff(output_path, image, tiff_options or TiffOptions())
+        return
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image, 'RGB')
+    if pil_format == "JPEG":
+        image.save(output_path, pil_format, quality=spec.quality, optimize=True)
+    else:
+        image.save(output_path, pil_format)
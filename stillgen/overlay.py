@@ -1,75 +1,79 @@
 # overlay.py - Text and logo overlay generation
 import os
+import threading
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List, Union
 import logging
-from functools import lru_cache
 from pathlib import Path
 
 from .parsers import get_value_fuzzy
+from .plate import OverlayPlate, load_logo_plate, render_border_frame
+from .glyphs import render_text_mask, text_width
+from .resources import BoundedCache, get_registry
+from .compositor import Canvas
 
 logger = logging.getLogger(__name__)
 
+# Top columns read from the per-frame CSV: focus/aperture, lens, camera tilt/roll
+FRAME_TOP_COLUMNS = (3, 4, 6)
+
+# Rendered clip-constant text layers kept per OverlayGenerator
+CLIP_TEXT_CACHE_SIZE = 8
+
+# (position, text, font) of one text block
+TextItem = Tuple[Tuple[int, int], str, ImageFont.FreeTypeFont]
+
+
+# Fonts tried when the configured font cannot be loaded
+DEFAULT_FONT_PATHS = [
+    "/System/Library/Fonts/Helvetica.ttc",  # macOS
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",  # Linux
+    "C:\\Windows\\Fonts\\arial.ttf"  # Windows
+]
+
+
+def _load_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    # The basic layout engine lays strings out glyph by glyph, which the glyph atlas reproduces
+    try:
+        return ImageFont.truetype(font_path, size, layout_engine=ImageFont.Layout.BASIC)
+    except OSError:
+        logger.warning(f"Failed to load font from {font_path}, trying fallbacks")
+        
+        # Try default system fonts
+        for default_path in DEFAULT_FONT_PATHS:
+            if os.path.exists(default_path):
+                try:
+                    font = ImageFont.truetype(default_path, size, layout_engine=ImageFont.Layout.BASIC)
+                    logger.info(f"Using fallback font: {default_path}")
+                    return font
+                except OSError:
+                    continue
+        
+        # Final fallback to default font
+        return ImageFont.load_default()
+
+
+def _load_rgba(path: str) -> Image.Image:
+    with Image.open(path) as image:
+        return image.convert("RGBA")
+
 
 class FontCache:
-    """Cache for loaded fonts."""
-    
-    def __init__(self):
-        self._cache = {}
-        self._default_font_paths = [
-            "/System/Library/Fonts/Helvetica.ttc",  # macOS
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",  # Linux
-            "C:\\Windows\\Fonts\\arial.ttf"  # Windows
-        ]
+    """Fonts from the worker's shared resource registry."""
     
-    @lru_cache(maxsize=8)
     def get_font(self, font_path: str, size: int) -> ImageFont.FreeTypeFont:
-        """Get a font with caching."""
-        cache_key = f"{font_path}:{size}"
-        
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        try:
-            font = ImageFont.truetype(font_path, size)
-            self._cache[cache_key] = font
-            return font
-        except OSError:
-            logger.warning(f"Failed to load font from {font_path}, trying fallbacks")
-            
-            # Try default system fonts
-            for default_path in self._default_font_paths:
-                if os.path.exists(default_path):
-                    try:
-                        font = ImageFont.truetype(default_path, size)
-                        self._cache[cache_key] = font
-                        logger.info(f"Using fallback font: {default_path}")
-                        return font
-                    except OSError:
-                        continue
-            
-            # Final fallback to default font
-            font = ImageFont.load_default()
-            self._cache[cache_key] = font
-            return font
+        """Get a font, loading it (or a fallback) on first use in this worker."""
+        return get_registry().fonts.get((font_path, size), lambda: _load_font(font_path, size))
 
 
 class ImageCache:
-    """Cache for loaded images (logos)."""
-    
-    def __init__(self):
-        self._cache = {}
+    """Decoded logo images from the worker's shared resource registry."""
     
-    @lru_cache(maxsize=4)
     def load_image(self, path: str) -> Optional[Image.Image]:
-        """Load an image with caching."""
-        if path in self._cache:
-            return self._cache[path]
-        
+        """Load an image as RGBA; the returned image is shared and must not be modified."""
         try:
-            image = Image.open(path).convert("RGBA")
-            self._cache[path] = image
-            return image
+            return get_registry().images.get(path, lambda: _load_rgba(path))
         except Exception as e:
             logger.error(f"Failed to load image {path}: {e}")
             return None
@@ -78,11 +82,18 @@ class ImageCache:
 class OverlayGenerator:
     """Generate text and logo overlays for images."""
     
-    def __init__(self, config):
+    def __init__(self, config, scale: float = 1.0):
+        """scale sizes the fixed pixel spacings for renditions smaller than the master."""
         self.config = config
+        self.scale = scale
         self.font_cache = FontCache()
         self.image_cache = ImageCache()
         self.el_zone_processor = None
+        self._logo_plate = None
+        self._logo_plate_loaded = False
+        self._logo_plate_lock = threading.Lock()
+        self._border_frames: Dict[Tuple[int, int], OverlayPlate] = {}
+        self._clip_text_layers = BoundedCache("clip_text_layers", CLIP_TEXT_CACHE_SIZE)
         
         # Initialize EL Zone processor if overlay is enabled
         el_zone_overlay_enabled = getattr(config, 'el_zone_overlay', False)
@@ -98,83 +109,111 @@ class OverlayGenerator:
                 logger.error(f"Failed to initialize EL Zone processor: {e}")
                 self.el_zone_processor = None
     
-    def add_overlays(self, image: Image.Image, ale_entry: Dict, 
+    def add_overlays(self, canvas: Canvas, ale_entry: Dict, 
                     silverstack_entry: Optional[Dict], csv_entry: Optional[Dict],
-                    source_image: Optional[Image.Image] = None,
+                    source_image: Optional[Union[Image.Image, np.ndarray]] = None,
                     image_bounds: Optional[Dict] = None):
-        """Add all overlays to the image."""
+        """Add all overlays to the canvas.
+        
+        Each layer is blended into its own bounding box of the canvas buffer.
+        
+        source_image is the cropped, untransformed source for the EL Zone overlay:
+        a PIL image or a float (H, W, 3) array in the 0-1 range.
+        """
         # Add logos
         if not self.config.profile.settings.get('skip_overlays', False):
-            self._add_logos(image)
+            self._add_logos(canvas)
         
         # Add text overlays
-        self._add_text_overlays(image, ale_entry, silverstack_entry, csv_entry)
+        self._add_text_overlays(canvas, ale_entry, silverstack_entry, csv_entry)
         
         # Add EL Zone overlay if enabled
         logger.debug(f"add_overlays: el_zone_processor={self.el_zone_processor is not None}, source_image={source_image is not None}")
         if self.el_zone_processor and source_image is not None:
             logger.debug("Calling _add_el_zone_overlay")
-            self._add_el_zone_overlay(image, source_image, image_bounds)
+            self._add_el_zone_overlay(canvas, source_image, image_bounds)
         elif self.el_zone_processor and source_image is None:
             logger.warning("EL Zone processor available but source_image is None")
         elif not self.el_zone_processor and getattr(self.config, 'el_zone_overlay', False):
             logger.warning("EL Zone overlay enabled in config but processor not initialized")
     
-    def _add_logos(self, image: Image.Image):
+    def _px(self, value: int) -> int:
+        """A fixed master-canvas spacing in this generator's output pixels."""
+        return int(round(value * self.scale))
+    
+    def _get_logo_plate(self) -> Optional[OverlayPlate]:
+        """The pre-rendered logo plate, built (or read from the cache) on first use.
+
+        Generators are shared by the threads of the thread executor, so the plate is
+        loaded under a lock and only marked loaded once it has been assigned.
+        """
+        if not self._logo_plate_loaded:
+            with self._logo_plate_lock:
+                if not self._logo_plate_loaded:
+                    logo = self.image_cache.load_image(self.config.logo_image)
+                    tool = self.image_cache.load_image(self.config.tool_image)
+                    if logo and tool:
+                        self._logo_plate = load_logo_plate(logo, tool, self.config,
+                                                           getattr(self.config, 'cache_dir', None))
+                    self._logo_plate_loaded = True
+        return self._logo_plate
+    
+    def _add_logos(self, canvas: Canvas):
         """Add logo images to the container."""
-        logo = self.image_cache.load_image(self.config.logo_image)
-        tool = self.image_cache.load_image(self.config.tool_image)
-        
-        if not logo or not tool:
+        plate = self._get_logo_plate()
+        if plate is None:
             logger.warning("Logo images not found, skipping logo overlay")
             return
         
-        # Calculate scaling to fit within max height
-        max_height = self.config.logo_max_height
-        spacing = self.config.logo_spacing
-        available_height = max_height - spacing
-        
-        # Calculate scaling factors
-        logo_scale = min(1.0, available_height / (logo.height + tool.height))
-        tool_scale = logo_scale
-        
-        # Calculate new dimensions
-        new_logo_size = (int(logo.width * logo_scale), int(logo.height * logo_scale))
-        new_tool_size = (int(tool.width * tool_scale), int(tool.height * tool_scale))
-        
-        # Resize images
-        logo = logo.resize(new_logo_size, Image.Resampling.LANCZOS)
-        tool = tool.resize(new_tool_size, Image.Resampling.LANCZOS)
-        
-        # Calculate positions (bottom left)
-        padding = self.config.logo_padding
-        tool_y = image.height - tool.height - padding
-        logo_y = tool_y - logo.height - spacing
-        
-        # Paste logos
-        image.paste(logo, (padding, logo_y), logo)
-        image.paste(tool, (padding, tool_y), tool)
+        plate.composite(canvas)
     
-    def _add_text_overlays(self, image: Image.Image, ale_entry: Dict,
+    def _add_text_overlays(self, canvas: Canvas, ale_entry: Dict,
                           silverstack_entry: Optional[Dict], csv_entry: Optional[Dict]):
-        """Add text overlays to the image."""
-        draw = ImageDraw.Draw(image)
+        """Add text overlays to the canvas.
+        
+        Clip-constant text is composited from a cached layer; only the fields read
+        from the per-frame CSV are rasterized for every still.
+        """
+        items = []
         
         # Add top text columns
-        self._add_top_text(draw, ale_entry, silverstack_entry, csv_entry)
+        items += self._layout_top_text(ale_entry, silverstack_entry, csv_entry)
         
         # Add bottom center text (clip name)
-        self._add_bottom_center_text(draw, ale_entry)
+        items += self._layout_bottom_center_text(ale_entry)
         
         # Add bottom right text
-        self._add_bottom_right_text(draw, ale_entry, silverstack_entry, csv_entry)
+        items += self._layout_bottom_right_text(ale_entry, csv_entry)
         
         # Add bottom left text (director/cinematographer)
-        self._add_bottom_left_text(draw, silverstack_entry)
+        items += self._layout_bottom_left_text(silverstack_entry)
+        
+        for layer in self._get_clip_text_layer([item[:3] for item in items if not item[3]]):
+            layer.composite(canvas)
+        
+        for xy, text, font, per_frame in items:
+            if per_frame:
+                mask, origin = render_text_mask(font, xy, text)
+                if mask is not None:
+                    OverlayPlate.from_mask(mask, (255, 255, 255), origin).composite(canvas)
+    
+    def _get_clip_text_layer(self, items: List[TextItem]) -> List[OverlayPlate]:
+        """Clip-constant text as white alpha-mask plates, cached by the rendered strings."""
+        key = tuple((xy, text, getattr(font, 'size', 0)) for xy, text, font in items)
+        return self._clip_text_layers.get(key, lambda: self._render_text_layer(items))
+    
+    def _render_text_layer(self, items: List[TextItem]) -> List[OverlayPlate]:
+        # One plate per text block keeps the layer small; the blocks sit far apart
+        layer = []
+        for xy, text, font in items:
+            mask, origin = render_text_mask(font, xy, text)
+            if mask is not None:
+                layer.append(OverlayPlate.from_mask(mask, (255, 255, 255), origin))
+        return layer
     
-    def _add_top_text(self, draw: ImageDraw.Draw, ale_entry: Dict,
-                     silverstack_entry: Optional[Dict], csv_entry: Optional[Dict]):
-        """Add top text columns."""
+    def _layout_top_text(self, ale_entry: Dict, silverstack_entry: Optional[Dict],
+                         csv_entry: Optional[Dict]) -> List[Tuple]:
+        """Lay out top text columns."""
         font = self.font_cache.get_font(self.config.font_path, self.config.font_size_medium)
         
         # Prepare column texts
@@ -186,24 +225,23 @@ class OverlayGenerator:
         num_columns = len(column_texts)
         
         if num_columns == 0:
-            return
+            return []
         
         segment_width = usable_width / num_columns
         
-        # Draw each column
+        # Place each column
+        items = []
         for i, text in enumerate(column_texts):
             # Calculate text dimensions
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
+            width = text_width(font, text)
             
             # Calculate position
             column_start_x = margin + i * segment_width
-            centering_offset = (segment_width - text_width) // 2
+            centering_offset = (segment_width - width) // 2
             draw_x = column_start_x + centering_offset
             
-            # Draw text
-            draw.multiline_text((int(draw_x), self.config.text_y_top), text, 
-                               font=font, fill="white")
+            items.append(((int(draw_x), self.config.text_y_top), text, font, i in FRAME_TOP_COLUMNS))
+        return items
     
     def _prepare_column_texts(self, ale_entry: Dict, silverstack_entry: Optional[Dict], 
                             csv_entry: Optional[Dict]) -> List[str]:
@@ -248,23 +286,20 @@ class OverlayGenerator:
         
         return [col1_text, col2_text, col3_text, col4_text, col5_text, col6_text, col7_text]
     
-    def _add_bottom_center_text(self, draw: ImageDraw.Draw, ale_entry: Dict):
-        """Add bottom center text (clip name)."""
+    def _layout_bottom_center_text(self, ale_entry: Dict) -> List[Tuple]:
+        """Lay out bottom center text (clip name)."""
         font = self.font_cache.get_font(self.config.font_path, self.config.font_size_large)
         
         text = get_value_fuzzy(ale_entry, 'Name', 'Clip Name')
         
         # Calculate position
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (self.config.output_width - text_width) // 2
+        x = (self.config.output_width - text_width(font, text)) // 2
         y = self.config.output_height - self.config.text_y_bottom
         
-        draw.text((x, y), text, font=font, fill="white")
+        return [((x, y), text, font, False)]
     
-    def _add_bottom_right_text(self, draw: ImageDraw.Draw, ale_entry: Dict,
-                               silverstack_entry: Optional[Dict], csv_entry: Optional[Dict]):
-        """Add bottom right text columns."""
+    def _layout_bottom_right_text(self, ale_entry: Dict, csv_entry: Optional[Dict]) -> List[Tuple]:
+        """Lay out bottom right text columns."""
         font = self.font_cache.get_font(self.config.font_path, self.config.font_size_small)
         
         # Column 1: Tape and Timecode
@@ -280,27 +315,19 @@ class OverlayGenerator:
         
         # Calculate positions
         margin = self.config.logo_padding
-        spacing = 100  # Space between columns
-        
-        # Get text dimensions
-        bbox1 = draw.textbbox((0, 0), col1_text, font=font)
-        bbox2 = draw.textbbox((0, 0), col2_text, font=font)
-        col1_width = bbox1[2] - bbox1[0]
-        col2_width = bbox2[2] - bbox2[0]
+        spacing = self._px(100)  # Space between columns
         
         # Position columns (right-aligned)
-        col2_x = self.config.output_width - col2_width - margin
-        col1_x = col2_x - col1_width - spacing
+        col2_x = self.config.output_width - text_width(font, col2_text) - margin
+        col1_x = col2_x - text_width(font, col1_text) - spacing
         y = self.config.output_height - self.config.text_y_bottom
         
-        # Draw text
-        draw.multiline_text((col1_x, y), col1_text, font=font, fill="white")
-        draw.multiline_text((col2_x, y), col2_text, font=font, fill="white")
+        return [((col1_x, y), col1_text, font, True), ((col2_x, y), col2_text, font, False)]
     
-    def _add_bottom_left_text(self, draw: ImageDraw.Draw, silverstack_entry: Optional[Dict]):
-        """Add bottom left text (director and cinematographer)."""
+    def _layout_bottom_left_text(self, silverstack_entry: Optional[Dict]) -> List[Tuple]:
+        """Lay out bottom left text (director and cinematographer)."""
         if not silverstack_entry:
-            return
+            return []
         
         font = self.font_cache.get_font(self.config.font_path, self.config.font_size_medium)
         
@@ -308,40 +335,31 @@ class OverlayGenerator:
         cinematographer = get_value_fuzzy(silverstack_entry, 'Cinematographer', 'DP', 'DOP')
         
         if director == 'N/A' and cinematographer == 'N/A':
-            return
+            return []
         
         text = f"Director: {director}\n \nCinematographer: {cinematographer}"
         
-        # Position next to logos
-        # Get logo dimensions to position text appropriately
-        logo = self.image_cache.load_image(self.config.logo_image)
-        if logo:
-            # Calculate scaling (same as in _add_logos)
-            max_height = self.config.logo_max_height
-            spacing = self.config.logo_spacing
-            available_height = max_height - spacing
-            
-            tool = self.image_cache.load_image(self.config.tool_image)
-            if tool:
-                logo_scale = min(1.0, available_height / (logo.height + tool.height))
-                scaled_logo_width = int(logo.width * logo_scale)
-                scaled_tool_height = int(tool.height * logo_scale)
-                
-                # Position text to the right of logos
-                x = self.config.logo_padding + scaled_logo_width + 20
-                
-                # Position above the tool image
-                padding = self.config.logo_padding
-                tool_y = self.config.output_height - scaled_tool_height - padding
-                y = tool_y - 160
-                
-                draw.multiline_text((x, y), text, font=font, fill="white")
+        # Position next to logos, using the scaled sizes from the logo plate
+        plate = self._get_logo_plate()
+        if not plate:
+            return []
+        
+        # Position text to the right of logos
+        x = self.config.logo_padding + plate.layout['logo_width'] + self._px(20)
+        
+        # Position above the tool image
+        padding = self.config.logo_padding
+        tool_y = self.config.output_height - plate.layout['tool_height'] - padding
+        y = tool_y - self._px(160)
+        
+        return [((x, y), text, font, False)]
     
-    def _add_el_zone_overlay(self, image: Image.Image, source_image: Image.Image,
+    def _add_el_zone_overlay(self, canvas: Canvas, source_image: Union[Image.Image, np.ndarray],
                             image_bounds: Optional[Dict] = None):
-        """Add EL Zone overlay to the image."""
+        """Add EL Zone overlay to the canvas."""
         try:
-            logger.debug(f"_add_el_zone_overlay called with image size: {image.size}, source_image size: {source_image.size}, bounds: {image_bounds}")
+            source_size = source_image.size if isinstance(source_image, Image.Image) else source_image.shape[1::-1]
+            logger.debug(f"_add_el_zone_overlay called with canvas size: {canvas.size}, source_image size: {source_size}, bounds: {image_bounds}")
             
             # Get overlay size from config
             overlay_size = getattr(self.config, 'el_zone_overlay_size', 400)
@@ -351,13 +369,21 @@ class OverlayGenerator:
             el_zone_overlay = self.el_zone_processor.create_el_zone_overlay(
                 source_image, 
                 size=overlay_size,
-                add_border=True
+                add_border=False
             )
             logger.debug(f"EL Zone overlay generated with size: {el_zone_overlay.size}")
             
+            # The white border is a static frame plate, rendered once per overlay size
+            border = 2
+            frame_size = (el_zone_overlay.width + 2 * border, el_zone_overlay.height + 2 * border)
+            frame = self._border_frames.get(frame_size)
+            if frame is None:
+                frame = render_border_frame(frame_size, border)
+                self._border_frames[frame_size] = frame
+            
             # Calculate position based on config and image bounds
             position = getattr(self.config, 'el_zone_overlay_position', 'bottom_right')
-            padding = 20  # Padding from edges
+            padding = self._px(20)  # Padding from edges
             logger.debug(f"EL Zone overlay position: {position}")
             
             # Use image bounds if provided, otherwise use full canvas
@@ -370,31 +396,32 @@ class OverlayGenerator:
             else:
                 img_x = 0
                 img_y = 0
-                img_width = image.width
-                img_height = image.height
+                img_width = canvas.width
+                img_height = canvas.height
                 logger.debug("No image bounds provided, using full canvas")
             
             # Calculate position relative to the actual image content
             if position == 'bottom_right':
-                x = img_x + img_width - el_zone_overlay.width - padding
-                y = img_y + img_height - el_zone_overlay.height - padding
+                x = img_x + img_width - frame.width - padding
+                y = img_y + img_height - frame.height - padding
             elif position == 'bottom_left':
                 x = img_x + padding
-                y = img_y + img_height - el_zone_overlay.height - padding
+                y = img_y + img_height - frame.height - padding
             elif position == 'top_right':
-                x = img_x + img_width - el_zone_overlay.width - padding
+                x = img_x + img_width - frame.width - padding
                 y = img_y + padding
             elif position == 'top_left':
                 x = img_x + padding
                 y = img_y + padding
             else:
                 # Default to bottom right
-                x = img_x + img_width - el_zone_overlay.width - padding
-                y = img_y + img_height - el_zone_overlay.height - padding
+                x = img_x + img_width - frame.width - padding
+                y = img_y + img_height - frame.height - padding
             
             # Composite the EL Zone overlay onto the main image
             logger.debug(f"Pasting EL Zone overlay at position: ({x}, {y})")
-            image.paste(el_zone_overlay, (x, y), el_zone_overlay)
+            canvas.paste(x + border, y + border, np.asarray(el_zone_overlay.convert('RGB')))
+            frame.composite(canvas, (x, y))
             logger.info("EL Zone overlay successfully added to image")
             
         except Exception as e:
@@ -416,19 +443,17 @@ class TextLayoutCalculator:
         segment_width = usable_width / num_columns
         
         positions = []
-        draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))  # Dummy draw for text measurement
         
         for i, text in enumerate(texts):
             # Get text width
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
+            width = text_width(font, text)
             
             # Calculate centered position within segment
             segment_start = margin + i * segment_width
-            centering_offset = (segment_width - text_width) // 2
+            centering_offset = (segment_width - width) // 2
             x = segment_start + centering_offset
             
-            positions.append((int(x), text_width))
+            positions.append((int(x), width))
         
         return positions
     
@@ -439,12 +464,9 @@ class TextLayoutCalculator:
         lines = []
         current_line = []
         
-        draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))  # Dummy draw for text measurement
-        
         for word in words:
             test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            line_width = bbox[2] - bbox[0]
+            line_width = text_width(font, test_line)
             
             if line_width <= max_width:
                 current_line.append(word)
@@ -499,12 +521,13 @@ def create_test_overlay(config, output_path: str = "test_overlay.png"):
     }
     
     # Create test image
-    test_image = Image.new('RGBA', (config.output_width, config.output_height), (50, 50, 50, 255))
+    test_canvas = Canvas(config.output_width, config.output_height)
+    test_canvas.pixels[...] = 50
     
     # Add overlays
     generator = OverlayGenerator(config)
-    generator.add_overlays(test_image, test_ale, test_silverstack, test_csv)
+    generator.add_overlays(test_canvas, test_ale, test_silverstack, test_csv)
     
     # Save test image
-    test_image.save(output_path)
+    test_canvas.to_image().save(output_path)
     logger.info(f"Test overlay image saved to {output_path}")
\ No newline at end of file
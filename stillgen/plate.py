@@ -0,0 +1,131 @@
+# plate.py - Pre-rendered static overlay plates composited onto each frame
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
+
+from .compositor import Canvas
+from .utils import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# PNG text chunk holding a cached plate's origin and layout values
+PLATE_INFO_KEY = "stillgen:plate"
+
+
+class OverlayPlate:
+    """A static RGBA overlay element, premultiplied once and blended in one NumPy pass.
+
+    Only the plate's bounding box is stored and touched when compositing.
+    layout carries values derived while rendering (e.g. scaled logo sizes) that
+    other overlay elements position themselves against.
+    """
+
+    def __init__(self, rgba: np.ndarray, origin: Tuple[int, int] = (0, 0),
+                 layout: Optional[Dict] = None):
+        self.origin = origin
+        self.layout = layout or {}
+        self.rgba = rgba
+        self.height, self.width = rgba.shape[:2]
+
+        alpha = rgba[..., 3:4].astype(np.uint32)
+        self._premultiplied = rgba[..., :3].astype(np.uint32) * alpha
+        self._inverse_alpha = 255 - alpha
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, color: Tuple[int, int, int],
+                  origin: Tuple[int, int] = (0, 0)) -> 'OverlayPlate':
+        """A solid-color plate whose coverage is an 8-bit alpha mask (e.g. rendered text)."""
+        rgba = np.empty(mask.shape + (4,), dtype=np.uint8)
+        rgba[..., :3] = color
+        rgba[..., 3] = mask
+        return cls(rgba, origin)
+
+    def composite(self, canvas: Canvas, origin: Optional[Tuple[int, int]] = None):
+        """Blend the plate 'over' a canvas in place (at origin, default the plate's own)."""
+        x, y = origin if origin is not None else self.origin
+        canvas.blend(x, y, self._premultiplied, self._inverse_alpha)
+
+
+def _get_plate_cache_path(cache_dir: str, config) -> str:
+    """Plate path keyed by the logo files and every setting that affects the plate."""
+    parts = [config.output_width, config.output_height, config.logo_max_height,
+             config.logo_spacing, config.logo_padding]
+    for path in (config.logo_image, config.tool_image):
+        stat = os.stat(path)
+        parts += [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+    key = hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+    return os.path.join(cache_dir, f"logo_plate_{key}.png")
+
+
+def _render_logo_plate(logo: Image.Image, tool: Image.Image, config) -> OverlayPlate:
+    """Scale and place the logo above the tool image in the bottom-left corner."""
+    # Calculate scaling to fit within max height
+    spacing = config.logo_spacing
+    available_height = config.logo_max_height - spacing
+    scale = min(1.0, available_height / (logo.height + tool.height))
+
+    logo = logo.resize((int(logo.width * scale), int(logo.height * scale)), Image.Resampling.LANCZOS)
+    tool = tool.resize((int(tool.width * scale), int(tool.height * scale)), Image.Resampling.LANCZOS)
+
+    # Calculate positions (bottom left)
+    padding = config.logo_padding
+    tool_y = config.output_height - tool.height - padding
+    logo_y = tool_y - logo.height - spacing
+
+    # Render into the bounding box of both images
+    left, top = padding, logo_y
+    plate = Image.new('RGBA', (max(logo.width, tool.width), tool_y + tool.height - top), (0, 0, 0, 0))
+    plate.alpha_composite(logo, (0, 0))
+    plate.alpha_composite(tool, (0, tool_y - top))
+
+    layout = {'logo_width': logo.width, 'tool_height': tool.height}
+    return OverlayPlate(np.asarray(plate), (left, top), layout)
+
+
+def load_logo_plate(logo: Image.Image, tool: Image.Image, config,
+                    cache_dir: Optional[str] = None) -> OverlayPlate:
+    """Get the logo plate for config's canvas, rendering and caching it on first use.
+
+    With a cache_dir the rendered plate is stored as a PNG, so later runs and other
+    workers skip the LANCZOS downscales of the source logos.
+    """
+    cache_path = None
+    if cache_dir is not None:
+        try:
+            cache_path = _get_plate_cache_path(cache_dir, config)
+            if os.path.exists(cache_path):
+                with Image.open(cache_path) as cached:
+                    info = json.loads(cached.text[PLATE_INFO_KEY])
+                    return OverlayPlate(np.asarray(cached.convert('RGBA')), tuple(info['origin']),
+                                        info['layout'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable overlay plate cache: {e}")
+
+    plate = _render_logo_plate(logo, tool, config)
+
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            info = PngInfo()
+            info.add_text(PLATE_INFO_KEY, json.dumps({'origin': plate.origin, 'layout': plate.layout}))
+            # Write under a temporary name so concurrent workers never read a partial file
+            write_atomic(cache_path, Image.fromarray(plate.rgba, 'RGBA').save, 'PNG', pnginfo=info)
+            logger.debug(f"Cached overlay plate: {os.path.basename(cache_path)}")
+        except OSError as e:
+            logger.warning(f"Failed to cache overlay plate: {e}")
+
+    return plate
+
+
+def render_border_frame(size: Tuple[int, int], border: int,
+                        color: Tuple[int, int, int] = (255, 255, 255)) -> OverlayPlate:
+    """An opaque border of the given width around a transparent interior."""
+    frame = Image.new('RGBA', size, (0, 0, 0, 0))
+    ImageDraw.Draw(frame).rectangle((0, 0, size[0] - 1, size[1] - 1), outline=color + (255,), width=border)
+    return OverlayPlate(np.asarray(frame))
@@ -0,0 +1,120 @@
+# prefetch.py - Read-ahead of input stills into the page cache
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# "fadvise": ask the kernel to read ahead (posix_fadvise WILLNEED, non-blocking)
+# "read": read each file sequentially and discard the data (works on any filesystem)
+PREFETCH_MODES = ["auto", "fadvise", "read"]
+
+# Buffer size for "read" mode
+READ_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class Prefetcher:
+    """Warm the page cache for the next input files while the current one is processed.
+
+    A background thread walks the files in processing order and pulls each one into
+    the page cache, so the decoder's open() and reads hit memory instead of network
+    storage. Files stay in the read-ahead window until release()d after processing,
+    so the window holds the `workers` files being processed plus up to `depth`
+    ahead of them, within max_memory_mb. A single file larger than the ceiling is
+    still prefetched when nothing else is.
+    """
+
+    def __init__(self, paths: List[str], depth: int = 2, max_memory_mb: int = 512,
+                 mode: str = "auto", workers: int = 1):
+        if mode not in PREFETCH_MODES:
+            raise ValueError(f"Unknown prefetch mode '{mode}'. Choose from: {', '.join(PREFETCH_MODES)}")
+        if mode == "auto":
+            mode = "fadvise" if hasattr(os, 'posix_fadvise') else "read"
+
+        self.mode = mode
+        self._paths = list(paths)
+        self._depth = depth
+        self._window = depth + max(1, workers)
+        self._max_bytes = max_memory_mb * 1024 * 1024
+        self._ahead = OrderedDict()  # path -> bytes, prefetched and not yet released
+        self._ahead_bytes = 0
+        self._released = set()
+        self._next = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+        if depth > 0 and self._paths:
+            self._thread = threading.Thread(target=self._run, name="stillgen_prefetch", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        buffer = bytearray(READ_CHUNK_BYTES) if self.mode == "read" else None
+        while True:
+            with self._cond:
+                while not self._closed and self._next < len(self._paths):
+                    path = self._paths[self._next]
+                    if path in self._released:
+                        self._next += 1
+                        continue
+                    size = self._get_size(path)
+                    has_room = len(self._ahead) < self._window and (
+                        not self._ahead or self._ahead_bytes + size <= self._max_bytes)
+                    if has_room:
+                        break
+                    self._cond.wait()
+                if self._closed or self._next >= len(self._paths):
+                    return
+                self._ahead[path] = size
+                self._ahead_bytes += size
+                self._next += 1
+
+            self._prefetch_file(path, buffer)
+
+    @staticmethod
+    def _get_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _prefetch_file(self, path: str, buffer: bytearray = None):
+        try:
+            if self.mode == "fadvise":
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            else:
+                with open(path, 'rb', buffering=0) as f:
+                    while f.readinto(buffer):
+                        pass
+            logger.debug(f"Prefetched {os.path.basename(path)} ({self.mode})")
+        except OSError as e:
+            logger.debug(f"Prefetch of {path} failed: {e}")
+
+    def release(self, path: str):
+        """Mark a file as processed, freeing its place in the read-ahead window."""
+        with self._cond:
+            self._released.add(path)
+            size = self._ahead.pop(path, None)
+            if size is not None:
+                self._ahead_bytes -= size
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
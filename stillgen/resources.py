@@ -0,0 +1,121 @@
+# resources.py - Process-wide registry of shared, bounded resource caches
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default entry limits per resource kind
+REGISTRY_LIMITS = {
+    "fonts": 32,           # FreeType fonts per (path, size)
+    "images": 8,           # Decoded RGBA logo images
+    "luts": 16,            # Parsed .cube lattices (memory-mapped from the LUT cache)
+    "el_zone_tables": 4,   # EL Zone luminance/zone tables per log format
+    "glyph_atlases": 32,   # Glyph atlases per (font, size)
+}
+
+
+class BoundedCache:
+    """Thread-safe LRU cache with hit, miss and eviction counters.
+
+    Values are built by the factory passed to get() on a miss, outside the lock,
+    so a slow load does not block lookups of other keys. Values are shared by
+    every caller and must be treated as read-only. Failed loads (exceptions) are
+    not cached.
+    """
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], object]):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = factory()
+
+        with self._lock:
+            # Another thread may have loaded the same key meanwhile; keep the first
+            if key in self._entries:
+                return self._entries[key]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class ResourceRegistry:
+    """Fonts, logos, LUTs, EL Zone tables and glyph atlases shared by everything in a worker.
+
+    One registry exists per process (see get_registry()); overlay generators,
+    color engines and EL Zone processors created for different batches, renditions
+    or threads all draw from it instead of loading their own copies.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        limits = {**REGISTRY_LIMITS, **(limits or {})}
+        self.fonts = BoundedCache("fonts", limits["fonts"])
+        self.images = BoundedCache("images", limits["images"])
+        self.luts = BoundedCache("luts", limits["luts"])
+        self.el_zone_tables = BoundedCache("el_zone_tables", limits["el_zone_tables"])
+        self.glyph_atlases = BoundedCache("glyph_atlases", limits["glyph_atlases"])
+
+    @property
+    def caches(self):
+        return [self.fonts, self.images, self.luts, self.el_zone_tables, self.glyph_atlases]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {cache.name: cache.stats() for cache in self.caches}
+
+    def log_stats(self, level: int = logging.DEBUG):
+        summary = "; ".join(
+            f"{name} {stats['entries']}/{stats['max_entries']} "
+            f"({stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evicted)"
+            for name, stats in self.stats().items()
+        )
+        logger.log(level, f"Resource caches: {summary}")
+
+
+_registry: Optional[ResourceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def init_registry(limits: Optional[Dict[str, int]] = None) -> ResourceRegistry:
+    """Create this process's registry; call once per worker (e.g. from a pool initializer)."""
+    global _registry
+    with _registry_lock:
+        _registry = ResourceRegistry(limits)
+    return _registry
+
+
+def get_registry() -> ResourceRegistry:
+    """This process's registry, created with the default limits on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ResourceRegistry()
+    return _registry
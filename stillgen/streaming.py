@@ -0,0 +1,279 @@
+# streaming.py - Strip-streamed color transform and resize for bounded memory
+import os
+import math
+import mmap
+import logging
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .color_engine import HAS_OIIO, load_image_array
+from .tiff_mmap import map_tiff
+
+logger = logging.getLogger(__name__)
+
+if HAS_OIIO:
+    import OpenImageIO as oiio
+
+# Strip height used when no memory budget is given
+DEFAULT_STRIP_ROWS = 256
+
+# Lanczos (a=3) support in source pixels per unit of downscale factor
+RESAMPLE_SUPPORT = {
+    Image.Resampling.LANCZOS: 3.0,
+    Image.Resampling.NEAREST: 0.5,
+}
+
+# Working bytes per source pixel in a strip: float32 RGB read, its transformed copy,
+# one float32 channel and PIL's copy of it
+BYTES_PER_STRIP_PIXEL = 3 * 4 + 3 * 4 + 4 + 4
+
+# Source bytes converted per step of a memory-mapped read before its pages are dropped
+MAPPED_BAND_BYTES = 4 * 1024 * 1024
+
+# Memory a streamed still needs regardless of strip height: transform block buffers,
+# resampling scratch and allocator slack
+STRIP_OVERHEAD_BYTES = 8 * 1024 * 1024
+
+
+class StripReader:
+    """Read horizontal bands of an image as float32 (rows, cols, 3) arrays.
+
+    Uncompressed strip TIFFs are memory-mapped, so a read touches only the pages
+    of the requested rows and columns. Other files use OpenImageIO scanline/tile
+    reads so only the requested rows are decoded; without the OIIO bindings the
+    whole image is loaded once and sliced.
+    """
+
+    def __init__(self, image_path: str):
+        self.image_path = image_path
+        self._input = None
+        self._pixels = None
+        self._mapped = map_tiff(image_path) if image_path.lower().endswith(('.tif', '.tiff')) else None
+
+        if self._mapped is not None:
+            self.height, self.width = self._mapped.shape[:2]
+            self._channels = min(self._mapped.shape[2], 3)
+            self._native_scale = float(np.iinfo(self._mapped.dtype).max)
+            logger.debug(f"Memory-mapped {image_path}")
+        elif HAS_OIIO:
+            self._input = oiio.ImageInput.open(image_path)
+            if self._input is None:
+                raise IOError(f"Failed to open {image_path}: {oiio.geterror()}")
+            spec = self._input.spec()
+            self.width = spec.width
+            self.height = spec.height
+            self._channels = min(spec.nchannels, 3)
+            self._tile_width = spec.tile_width
+            self._tile_height = spec.tile_height if spec.tile_width else 0
+            # Integer files are decimated in their native type before conversion to float
+            self._native_scale = {oiio.UINT8: 255.0, oiio.UINT16: 65535.0}.get(spec.format.basetype)
+        else:
+            logger.debug("OpenImageIO bindings not available, streaming from a fully decoded image")
+            self._pixels = load_image_array(image_path)
+            self.height, self.width = self._pixels.shape[:2]
+
+    def read_rows(self, y_begin: int, y_end: int, x_begin: int = 0,
+                  x_end: Optional[int] = None, step: int = 1) -> np.ndarray:
+        """Return rows [y_begin, y_end) and columns [x_begin, x_end) as float32 RGB.
+
+        With step > 1 only every step-th row and column is returned; scanline
+        files then decode just those rows.
+        """
+        if x_end is None:
+            x_end = self.width
+
+        if self._mapped is not None:
+            # Convert strided views of the mapping a few rows at a time, dropping each
+            # band's pages once copied, so a large read never holds the source pages
+            rows = range(y_begin, y_end, step)
+            pixels = np.empty((len(rows), len(range(x_begin, x_end, step)), self._channels),
+                              dtype=np.float32)
+            band = max(1, MAPPED_BAND_BYTES // (self._mapped.strides[0] * step))
+            for i in range(0, len(rows), band):
+                band_top = rows[i]
+                band_bottom = min(y_end, band_top + band * step)
+                pixels[i:i + band] = self._mapped[band_top:band_bottom:step, x_begin:x_end:step,
+                                                  :self._channels]
+                self.release_rows(band_top, band_bottom)
+            pixels *= 1.0 / self._native_scale
+            if self._channels == 1:
+                pixels = np.repeat(pixels, 3, axis=-1)
+            return pixels
+
+        if self._pixels is not None:
+            return self._pixels[y_begin:y_end:step, x_begin:x_end:step]
+
+        if step > 1 and not self._tile_height:
+            return self._read_decimated(y_begin, y_end, x_begin, x_end, step)
+
+        if self._tile_height:
+            # Tiled files are read as the block of whole tiles covering the region
+            tile_top = (y_begin // self._tile_height) * self._tile_height
+            tile_bottom = min(-(-y_end // self._tile_height) * self._tile_height, self.height)
+            tile_left = (x_begin // self._tile_width) * self._tile_width
+            tile_right = min(-(-x_end // self._tile_width) * self._tile_width, self.width)
+            pixels = self._input.read_tiles(0, 0, tile_left, tile_right, tile_top, tile_bottom, 0, 1,
+                                            0, self._channels, oiio.FLOAT)
+            if pixels is None:
+                raise IOError(f"Failed to read rows {y_begin}-{y_end} of {self.image_path}")
+            pixels = pixels.reshape(tile_bottom - tile_top, tile_right - tile_left, self._channels)
+            pixels = pixels[y_begin - tile_top:y_end - tile_top]
+            x_begin -= tile_left
+            x_end -= tile_left
+        else:
+            pixels = self._input.read_scanlines(0, 0, y_begin, y_end, 0, 0, self._channels, oiio.FLOAT)
+            if pixels is None:
+                raise IOError(f"Failed to read rows {y_begin}-{y_end} of {self.image_path}")
+            pixels = pixels.reshape(y_end - y_begin, self.width, self._channels)
+
+        pixels = pixels[::step, x_begin:x_end:step]
+        if self._channels == 1:
+            pixels = np.repeat(pixels, 3, axis=-1)
+        return np.ascontiguousarray(pixels)
+
+    def _read_decimated(self, y_begin: int, y_end: int, x_begin: int, x_end: int,
+                        step: int) -> np.ndarray:
+        read_format = oiio.FLOAT if self._native_scale is None else self._input.spec().format
+        rows = range(y_begin, y_end, step)
+        columns = len(range(x_begin, x_end, step))
+        pixels = np.empty((len(rows), columns, self._channels), dtype=np.float32)
+        for i, y in enumerate(rows):
+            row = self._input.read_scanline(y, 0, read_format)
+            if row is None:
+                raise IOError(f"Failed to read row {y} of {self.image_path}")
+            pixels[i] = row.reshape(self.width, -1)[x_begin:x_end:step, :self._channels]
+
+        if self._native_scale is not None:
+            pixels *= 1.0 / self._native_scale
+        if self._channels == 1:
+            pixels = np.repeat(pixels, 3, axis=-1)
+        return pixels
+
+    def release_rows(self, y_begin: int, y_end: int):
+        """Drop the mapped pages of rows [y_begin, y_end) from this process.
+
+        The pages stay in the page cache; rows read again are simply mapped back in.
+        Only memory-mapped files hold any.
+        """
+        handle = getattr(self._mapped, '_mmap', None)
+        if handle is None or y_end <= y_begin or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        # np.memmap maps from the allocation boundary below its offset
+        base = self._mapped.offset - self._mapped.offset % mmap.ALLOCATIONGRANULARITY
+        row_bytes = self._mapped.strides[0]
+        start = self._mapped.offset - base + y_begin * row_bytes
+        end = self._mapped.offset - base + y_end * row_bytes
+        # Whole pages only, so rows outside the range keep theirs
+        start = -(-start // mmap.PAGESIZE) * mmap.PAGESIZE
+        end = end // mmap.PAGESIZE * mmap.PAGESIZE
+        if end > start:
+            handle.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def close(self):
+        if self._input is not None:
+            self._input.close()
+            self._input = None
+        self._pixels = None
+        self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_strip_rows(crop_width: int, max_worker_memory_mb: int, reserved_bytes: int = 0) -> int:
+    """Source rows per strip that keep one strip's working set within the memory budget.
+
+    reserved_bytes (output buffers held for the whole still) are taken off the
+    budget first.
+    """
+    if max_worker_memory_mb <= 0:
+        return DEFAULT_STRIP_ROWS
+    budget = max_worker_memory_mb * 1024 * 1024 - reserved_bytes
+    rows = budget // (crop_width * BYTES_PER_STRIP_PIXEL)
+    if rows < 16:
+        logger.warning(f"Output buffers ({reserved_bytes >> 20} MB) leave no room for strips in a "
+                       f"{max_worker_memory_mb} MB budget, using 16-row strips")
+    return max(16, rows)
+
+
+def get_max_workers(max_worker_memory_mb: int) -> Optional[int]:
+    """Number of workers whose memory budget fits in physical memory, if known."""
+    if max_worker_memory_mb <= 0:
+        return None
+    try:
+        total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+    return max(1, total // (max_worker_memory_mb * 1024 * 1024))
+
+
+def stream_transform_resize(reader: StripReader, crop_box: Tuple[int, int, int, int],
+                            output_size: Tuple[int, int],
+                            transform: Callable[[np.ndarray], np.ndarray],
+                            resample: int = Image.Resampling.LANCZOS,
+                            max_worker_memory_mb: int = 0,
+                            reserved_bytes: int = 0) -> np.ndarray:
+    """Crop, color transform and resize an image one horizontal strip at a time.
+
+    Each strip of output rows is produced from the source rows it needs plus the
+    resampling filter's support, so the result matches a full-frame resize while
+    peak memory stays a small multiple of one strip.
+
+    Args:
+        reader: Open reader on the source image
+        crop_box: (left, top, right, bottom) in source pixels
+        output_size: (width, height) of the resized crop
+        transform: Color transform applied to float32 (rows, cols, 3) strips
+        resample: PIL resampling filter
+        max_worker_memory_mb: Memory budget that sets the strip height (0 = default)
+        reserved_bytes: Memory the caller holds outside this call (e.g. the output canvas);
+            the result array is accounted for here
+
+    Returns:
+        8-bit RGB (height, width, 3) array of output_size
+    """
+    left, top, right, bottom = crop_box
+    crop_width = right - left
+    crop_height = bottom - top
+    out_width, out_height = output_size
+
+    scale_y = crop_height / out_height
+    support = RESAMPLE_SUPPORT.get(resample, 3.0) * max(scale_y, 1.0)
+    margin = int(math.ceil(support)) + 1
+
+    source_rows = get_strip_rows(crop_width, max_worker_memory_mb,
+                                 reserved_bytes + out_width * out_height * 3 + STRIP_OVERHEAD_BYTES)
+    strip_rows = max(1, int((source_rows - 2 * margin) / scale_y))
+
+    result = np.empty((out_height, out_width, 3), dtype=np.uint8)
+    for out_top in range(0, out_height, strip_rows):
+        out_bottom = min(out_top + strip_rows, out_height)
+
+        # Source rows (relative to the crop) covered by this band, plus filter support
+        src_top = out_top * scale_y
+        src_bottom = out_bottom * scale_y
+        read_top = max(0, int(math.floor(src_top)) - margin)
+        read_bottom = min(crop_height, int(math.ceil(src_bottom)) + margin)
+
+        pixels = reader.read_rows(top + read_top, top + read_bottom, left, right)
+        strip = transform(pixels)
+        del pixels
+
+        # Resample in float, one channel at a time ('F' mode), quantizing each into the band
+        band_size = (out_width, out_bottom - out_top)
+        box = (0, src_top - read_top, crop_width, src_bottom - read_top)
+        band = result[out_top:out_bottom]
+        for channel in range(3):
+            resized = np.asarray(
+                Image.fromarray(np.ascontiguousarray(strip[..., channel], dtype=np.float32), 'F')
+                .resize(band_size, resample, box=box))
+            band[..., channel] = np.clip(resized, 0.0, 1.0) * 255.0 + 0.5
+        # Free this strip before the next one is read, so only one is ever alive
+        del strip
+
+    return result
@@ -0,0 +1,115 @@
+# tiff_mmap.py - Zero-copy memory-mapped access to uncompressed TIFF stills
+import os
+import struct
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Baseline TIFF tags read from the first IFD
+TAG_IMAGE_WIDTH = 256
+TAG_IMAGE_LENGTH = 257
+TAG_BITS_PER_SAMPLE = 258
+TAG_COMPRESSION = 259
+TAG_PHOTOMETRIC = 262
+TAG_STRIP_OFFSETS = 273
+TAG_SAMPLES_PER_PIXEL = 277
+TAG_ROWS_PER_STRIP = 278
+TAG_STRIP_BYTE_COUNTS = 279
+TAG_PLANAR_CONFIG = 284
+TAG_TILE_WIDTH = 322
+TAG_SAMPLE_FORMAT = 339
+
+# TIFF field type -> struct code (BYTE, SHORT, LONG)
+FIELD_TYPES = {1: 'B', 3: 'H', 4: 'I'}
+
+# Photometric interpretation the pipeline reads as-is: RGB (MinIsBlack with extra
+# samples would otherwise be read as color channels)
+PHOTOMETRIC_RGB = 2
+
+# Samples per pixel the pipeline slices its RGB channels from: RGB, RGBA
+SUPPORTED_SAMPLES = (3, 4)
+
+
+def _read_ifd(f, byte_order: str, offset: int) -> Dict[int, tuple]:
+    """Read the numeric entries of one IFD as {tag: values}."""
+    f.seek(offset)
+    (count,) = struct.unpack(byte_order + 'H', f.read(2))
+    entries = f.read(count * 12)
+
+    tags = {}
+    for i in range(count):
+        tag, field_type, value_count, value = struct.unpack_from(byte_order + 'HHI4s', entries, i * 12)
+        code = FIELD_TYPES.get(field_type)
+        if code is None:
+            continue
+        size = struct.calcsize(code) * value_count
+        if size <= 4:
+            data = value[:size]
+        else:
+            (data_offset,) = struct.unpack(byte_order + 'I', value)
+            position = f.tell()
+            f.seek(data_offset)
+            data = f.read(size)
+            f.seek(position)
+        tags[tag] = struct.unpack(f"{byte_order}{value_count}{code}", data)
+    return tags
+
+
+def map_tiff(image_path: str) -> Optional[np.ndarray]:
+    """Memory-map the pixels of an uncompressed, strip-organized TIFF.
+
+    Returns a read-only (height, width, samples) uint8/uint16 array backed by the
+    page cache, so slicing a crop reads only the pages it touches. Returns None
+    for anything else (compressed, tiled, planar, BigTIFF, float or signed samples,
+    anything but RGB photometric with 3 or 4 samples, non-contiguous strips),
+    leaving those files to OpenImageIO or PIL.
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            header = f.read(8)
+            if len(header) < 8 or header[:2] not in (b'II', b'MM'):
+                return None
+            byte_order = '<' if header[:2] == b'II' else '>'
+            magic, ifd_offset = struct.unpack(byte_order + 'HI', header[2:])
+            if magic != 42:
+                return None  # BigTIFF or not a TIFF
+            tags = _read_ifd(f, byte_order, ifd_offset)
+    except (OSError, struct.error) as e:
+        logger.debug(f"Cannot parse TIFF header of {image_path}: {e}")
+        return None
+
+    def tag(name: int, default=None):
+        return tags.get(name, (default,))[0]
+
+    width = tag(TAG_IMAGE_WIDTH)
+    height = tag(TAG_IMAGE_LENGTH)
+    samples = tag(TAG_SAMPLES_PER_PIXEL, 1)
+    bits = tags.get(TAG_BITS_PER_SAMPLE, (1,))
+    offsets = tags.get(TAG_STRIP_OFFSETS)
+    byte_counts = tags.get(TAG_STRIP_BYTE_COUNTS)
+
+    if (not width or not height or not offsets or not byte_counts
+            or tag(TAG_COMPRESSION, 1) != 1
+            or tag(TAG_PLANAR_CONFIG, 1) != 1
+            or tag(TAG_SAMPLE_FORMAT, 1) != 1
+            or tag(TAG_PHOTOMETRIC) != PHOTOMETRIC_RGB
+            or samples not in SUPPORTED_SAMPLES
+            or TAG_TILE_WIDTH in tags
+            or len(set(bits)) != 1 or bits[0] not in (8, 16)):
+        return None
+
+    # Strips must follow each other in the file so the image is one contiguous block
+    for i in range(len(offsets) - 1):
+        if offsets[i] + byte_counts[i] != offsets[i + 1]:
+            return None
+
+    dtype = np.dtype(np.uint8) if bits[0] == 8 else np.dtype(byte_order + 'u2')
+    image_bytes = width * height * samples * dtype.itemsize
+    if sum(byte_counts) < image_bytes or offsets[0] + image_bytes > os.path.getsize(image_path):
+        return None
+
+    return np.memmap(image_path, dtype=dtype, mode='r', offset=offsets[0],
+                     shape=(height, width, samples))
@@ -1,15 +1,36 @@
 # utils.py - Utility functions
 import os
 import re
+import uuid
 import random
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Generator
+from typing import Callable, List, Tuple, Optional, Dict, Generator
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+def write_atomic(output_path: str, write: Callable, *args, **kwargs):
+    """Run write(temp_path, *args, **kwargs) on a temporary name in the output folder,
+    then rename it into place.
+
+    Readers (and --resume) never see a partially written file, and a failed write
+    leaves no temporary file behind. The temporary name keeps the extension, since
+    writers pick the file format from it.
+    """
+    # Not mkstemp: its 0600 mode would carry over to the renamed output
+    directory, name = os.path.split(output_path)
+    temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}{os.path.splitext(name)[1]}")
+    try:
+        write(temp_path, *args, **kwargs)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 def find_tiff_files(input_folder: str) -> List[str]:
     """Recursively find all TIFF files in a folder."""
     tiff_files = []
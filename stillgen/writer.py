@@ -0,0 +1,134 @@
+# writer.py - TIFF output codecs and write-behind output stage
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, List, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .color_engine import HAS_OIIO, save_image_array
+from .utils import write_atomic
+
+logger = logging.getLogger(__name__)
+
+TIFF_COMPRESSIONS = ["none", "deflate", "zstd", "lzw"]
+
+# Codec names per writer; OpenImageIO writes deflate instead of zstd if its libtiff lacks zstd
+_OIIO_COMPRESSION = {"none": "none", "deflate": "zip", "zstd": "zstd", "lzw": "lzw"}
+_PIL_COMPRESSION = {"none": "raw", "deflate": "tiff_adobe_deflate", "zstd": "zstd", "lzw": "tiff_lzw"}
+
+# TIFF Predictor tag: 1 = none, 2 = horizontal differencing (integer samples)
+TIFF_PREDICTOR_TAG = 317
+
+
+@dataclass
+class TiffOptions:
+    """Codec settings for output TIFFs."""
+    compression: str = "none"
+    predictor: bool = True  # Horizontal differencing before deflate/zstd/LZW
+    tile_size: int = 0  # Square tile edge in pixels (0 = strips)
+
+    @classmethod
+    def from_config(cls, config) -> 'TiffOptions':
+        """Profile codec settings, overridden by any Config values that are set."""
+        settings = config.profile.settings
+        compression = getattr(config, 'tiff_compression', None) or settings.get('tiff_compression', 'none')
+        tile_size = getattr(config, 'tiff_tile_size', None)
+        if tile_size is None:
+            tile_size = settings.get('tiff_tile_size', 0)
+        if compression not in TIFF_COMPRESSIONS:
+            raise ValueError(f"Unknown TIFF compression '{compression}'. "
+                             f"Choose from: {', '.join(TIFF_COMPRESSIONS)}")
+        return cls(compression, settings.get('tiff_predictor', True), tile_size)
+
+
+def write_tiff(output_path: str, image: Union[Image.Image, np.ndarray], options: TiffOptions):
+    """Write an 8-bit PIL image or a uint8/uint16 array as a TIFF with the given codec.
+
+    OpenImageIO is used when available (it supports tiling and 16-bit); otherwise
+    PIL writes strips through libtiff.
+    """
+    compressed = options.compression != "none"
+
+    if HAS_OIIO:
+        attributes = {"compression": _OIIO_COMPRESSION[options.compression]}
+        if compressed:
+            attributes["tiff:Predictor"] = 2 if options.predictor else 1
+        pixels = np.asarray(image) if isinstance(image, Image.Image) else image
+        save_image_array(output_path, pixels, attributes, options.tile_size)
+        return
+
+    if isinstance(image, np.ndarray):
+        if image.dtype != np.uint8:
+            raise RuntimeError("Writing 16-bit images needs the OpenImageIO Python bindings")
+        image = Image.fromarray(image, 'RGB')
+    if options.tile_size:
+        logger.debug("Tiled TIFF output needs OpenImageIO; writing strips")
+
+    # Always name the codec: PIL otherwise reuses the compression of the file an image came from
+    save_args = {"compression": _PIL_COMPRESSION[options.compression]}
+    if compressed and options.predictor:
+        save_args["tiffinfo"] = {TIFF_PREDICTOR_TAG: 2}
+    image.save(output_path, 'TIFF', **save_args)
+
+
+def write_jpeg(output_path: str, image: Image.Image, quality: int = 95):
+    """Write an 8-bit RGB image as an optimized JPEG."""
+    image.save(output_path, 'JPEG', quality=quality, optimize=True)
+
+
+class BackgroundWriter:
+    """Write-behind output stage: a small writer thread pool fed by a bounded queue.
+
+    Outputs are encoded and written off the compute path, each to a temporary name
+    that is renamed into place when complete. Once max_pending writes are queued or
+    running, submit() blocks until one finishes, so memory held by pending images
+    stays bounded when storage is slower than compute.
+    """
+
+    def __init__(self, threads: int = 2, max_pending: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="stillgen_writer")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pending: List[Tuple[str, str, Future]] = []
+        self._failed: List[str] = []
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, output_path: str, write: Callable, *args):
+        """Queue write(output_path, *args); key identifies the input in flush() results.
+
+        The arguments are owned by the writer until the write completes and must not
+        be modified by the caller.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(write_atomic, output_path, write, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._pending.append((key, output_path, future))
+            self._collect_done()
+
+    def _collect_done(self):
+        """Drop finished writes from the pending list, recording failures (lock held)."""
+        still_pending = []
+        for key, output_path, future in self._pending:
+            if not future.done():
+                still_pending.append((key, output_path, future))
+            elif future.exception() is not None:
+                logger.error(f"Failed to write {output_path}: {future.exception()}")
+                self._failed.append(key)
+        self._pending = still_pending
+
+    def flush(self) -> List[str]:
+        """Wait for every queued write; return the keys of writes that failed since the last flush."""
+        with self._lock:
+            pending = list(self._pending)
+        wait([future for _, _, future in pending])
+        with self._lock:
+            self._collect_done()
+            failed, self._failed = self._failed, []
+        return failed
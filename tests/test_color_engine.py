@@ -0,0 +1,67 @@
+# test_color_engine.py - Parity of the in-process color backends against oiiotool
+import os
+import re
+import shutil
+
+import numpy as np
+import pytest
+
+tifffile = pytest.importorskip("tifffile")
+
+from stillgen import cdl
+from stillgen.color_engine import HAS_OCIO, verify_backend_parity
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stillgen", "static")
+CONFIG_TEMPLATE = os.path.join(STATIC_DIR, "config_template.ocio")
+LUT_DIR = os.path.join(STATIC_DIR, "lut_dir")
+
+# A-camera stills are LogC4; U/F cameras are REDLog3, converted through an input LUT first
+SOURCE_COLORSPACES = ["Arri LogC4", "REDLog3"]
+ASC_SOP = "(1.05 0.98 1.02)(0.01 -0.005 0.0)(0.95 1.0 1.05)"
+ASC_SAT = "0.9"
+
+
+def _missing_luts():
+    """3D LUTs the config template references that are not in lut_dir (they are not all shipped)."""
+    with open(CONFIG_TEMPLATE) as f:
+        names = set(re.findall(r"src:\s*([^,}\s]+\.cube)", f.read()))
+    return sorted(name for name in names if not os.path.exists(os.path.join(LUT_DIR, name)))
+
+
+pytestmark = [
+    pytest.mark.skipif(shutil.which("oiiotool") is None, reason="oiiotool not installed"),
+    pytest.mark.skipif(bool(_missing_luts()), reason=f"LUTs missing from lut_dir: {_missing_luts()}"),
+]
+
+
+@pytest.fixture
+def frame(tmp_path, monkeypatch):
+    """A small 16-bit log-like gradient still, with the CDL/OCIO caches kept in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cdl, "_cdl_cache", None)
+    monkeypatch.setattr(cdl, "_ocio_config_cache", None)
+
+    height, width = 24, 32
+    ramp = np.linspace(0.05, 0.85, width, dtype=np.float32)
+    pixels = np.empty((height, width, 3), dtype=np.float32)
+    pixels[..., 0] = ramp
+    pixels[..., 1] = ramp[::-1]
+    pixels[..., 2] = np.linspace(0.1, 0.7, height, dtype=np.float32)[:, None]
+    path = str(tmp_path / "frame.tif")
+    tifffile.imwrite(path, (pixels * 65535.0 + 0.5).astype(np.uint16), photometric='rgb')
+    return path
+
+
+@pytest.mark.parametrize("source_colorspace", SOURCE_COLORSPACES)
+@pytest.mark.parametrize("backend", [
+    "numpy",
+    pytest.param("ocio", marks=pytest.mark.skipif(not HAS_OCIO, reason="PyOpenColorIO not installed")),
+])
+def test_backend_matches_oiiotool(frame, backend, source_colorspace):
+    report = verify_backend_parity(frame, source_colorspace, ASC_SOP, ASC_SAT,
+                                   CONFIG_TEMPLATE, LUT_DIR, backend=backend)
+
+    assert report['backend'] == backend
+    assert report['passed'], report
+    assert report['max_error'] <= report['tolerance'] == pytest.approx(2.0 / 255.0)
+    assert report['mean_error'] <= report['max_error']
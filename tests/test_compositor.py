@@ -0,0 +1,50 @@
+# test_compositor.py - Tests for the NumPy output canvas
+import numpy as np
+
+from stillgen.compositor import Canvas
+
+
+def _rows(height: int, width: int) -> np.ndarray:
+    """An 8-bit picture whose red channel holds the row index."""
+    picture = np.zeros((height, width, 3), dtype=np.uint8)
+    picture[..., 0] = np.arange(height, dtype=np.uint8)[:, None]
+    return picture
+
+
+def test_place_centers_picture_vertically():
+    canvas = Canvas(8, 10)
+    bounds = canvas.place(_rows(4, 8))
+
+    assert bounds == {'x': 0, 'y': 3, 'width': 8, 'height': 4}
+    assert canvas.pixels[:3].max() == 0 and canvas.pixels[7:].max() == 0
+    np.testing.assert_array_equal(canvas.pixels[3:7, :, 0], _rows(4, 8)[..., 0])
+
+
+def test_place_crops_picture_taller_than_canvas():
+    canvas = Canvas(8, 6, deep=True)
+    picture = _rows(10, 8)
+    bounds = canvas.place(picture.astype(np.float32) / 255.0)
+
+    # The centered middle rows land on the canvas, like Image.paste at a negative y
+    assert bounds == {'x': 0, 'y': 0, 'width': 8, 'height': 6}
+    np.testing.assert_array_equal(canvas.pixels, picture[2:8])
+    np.testing.assert_array_equal(canvas.deep, picture[2:8].astype(np.uint16) * 257)
+
+
+def test_place_crops_picture_wider_than_canvas():
+    canvas = Canvas(6, 6)
+    bounds = canvas.place(_rows(4, 8), x=2)
+
+    assert bounds == {'x': 2, 'y': 1, 'width': 4, 'height': 4}
+    np.testing.assert_array_equal(canvas.pixels[1:5, 2:], _rows(4, 4))
+    assert canvas.pixels[:, :2].max() == 0
+
+
+def test_blend_clips_layer_to_canvas():
+    canvas = Canvas(4, 4)
+    premultiplied = np.full((3, 3, 3), 255 * 255, dtype=np.uint32)
+    inverse_alpha = np.zeros((3, 3, 1), dtype=np.uint32)
+    canvas.blend(2, -1, premultiplied, inverse_alpha)
+
+    assert canvas.pixels[:2, 2:].min() == 255
+    assert canvas.pixels[2:].max() == 0 and canvas.pixels[:, :2].max() == 0
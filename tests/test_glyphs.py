@@ -0,0 +1,15 @@
+# test_glyphs.py - Golden test: atlas-composed text matches ImageDraw
+import os
+
+from stillgen.config import Config
+from stillgen.glyphs import PARITY_SAMPLES, check_parity
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "stillgen", "static", "fonts", "monarcha-regular.ttf")
+
+
+def test_atlas_matches_imagedraw_at_overlay_sizes():
+    defaults = Config.__dataclass_fields__
+    sizes = [defaults[name].default for name in ('font_size_small', 'font_size_medium', 'font_size_large')]
+
+    assert check_parity(FONT_PATH, sizes, PARITY_SAMPLES) == 0
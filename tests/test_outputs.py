@@ -0,0 +1,18 @@
+# test_outputs.py - Tests for extra output renditions
+import numpy as np
+from PIL import Image
+
+from stillgen.outputs import OutputSpec, save_output
+from stillgen.writer import TiffOptions
+
+
+def test_tiff_rendition_uses_tiff_options(tmp_path):
+    path = str(tmp_path / "still_640.tiff")
+    pixels = np.zeros((36, 64, 3), dtype=np.uint8)
+    pixels[:, :, 0] = np.arange(64, dtype=np.uint8)
+
+    save_output(path, pixels, OutputSpec(64, 36, format="tiff"), TiffOptions(compression="deflate"))
+
+    with Image.open(path) as image:
+        assert image.info["compression"] == "tiff_adobe_deflate"
+        np.testing.assert_array_equal(np.asarray(image), pixels)
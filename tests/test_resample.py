@@ -0,0 +1,61 @@
+# test_resample.py - Tests for the banded resampler
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from stillgen.resample import get_reduce_factor, resize_image
+
+
+def _noise(width: int, height: int, mode: str) -> Image.Image:
+    """Random pixels, the worst case for coefficient rounding differences."""
+    pixels = np.random.default_rng(width * height).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    return image if mode == 'RGB' else image.getchannel(0).convert('F')
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'F'])
+@pytest.mark.parametrize('source, size', [
+    ((4378, 1842), (3840, 1616)),
+    ((1501, 999), (1000, 666)),
+])
+def test_banded_matches_single_resize(mode, source, size):
+    image = _noise(*source, mode)
+    expected = image.resize(size, Image.Resampling.LANCZOS)
+
+    banded = resize_image(image, size, Image.Resampling.LANCZOS, method='banded', threads=4)
+
+    np.testing.assert_array_equal(np.asarray(banded), np.asarray(expected))
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'F'])
+def test_banded_reduce_matches_single_resize_of_reduced_image(mode):
+    # 1501 / 3 leaves a partial block, so the filter box is fractional
+    image = _noise(1501, 1001, mode)
+    size = (250, 166)
+    factor = get_reduce_factor(image.size, size, 2.0)
+    assert factor == 3
+    box = (0.0, 0.0, image.width / factor, image.height / factor)
+    expected = image.reduce(factor).resize(size, Image.Resampling.LANCZOS, box=box)
+
+    banded = resize_image(image, size, Image.Resampling.LANCZOS, method='banded', threads=4,
+                          reducing_gap=2.0)
+
+    np.testing.assert_array_equal(np.asarray(banded), np.asarray(expected))
+
+
+def test_different_thread_counts_resize_concurrently():
+    # A new thread count must not shut down a pool another thread is using
+    image = _noise(1024, 512, 'RGB')
+    expected = np.asarray(image.resize((512, 256), Image.Resampling.LANCZOS))
+
+    def resize(threads: int) -> np.ndarray:
+        return np.asarray(resize_image(image, (512, 256), Image.Resampling.LANCZOS,
+                                       method='banded', threads=threads))
+
+    with ThreadPoolExecutor(max_workers=4) as callers:
+        results = list(callers.map(resize, [2, 3, 4, 2, 3, 4, 2, 3]))
+
+    for result in results:
+        np.testing.assert_array_equal(result, expected)
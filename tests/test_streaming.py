@@ -0,0 +1,123 @@
+# test_streaming.py - Memory bounds of the strip-streamed processing path
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+tifffile = pytest.importorskip("tifffile")
+
+from stillgen import cdl
+from stillgen.config import Config
+from stillgen.parsers import LazyCSVLoader
+from stillgen.image_processor import StillProcessor
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stillgen", "static")
+
+# A template whose looks need no LUT files: LogC4 is taken as the reference space and
+# the output applies only the CDL
+CDL_ONLY_TEMPLATE = """ocio_profile_version: 1
+
+search_path: luts
+strictparsing: true
+luma: [0.2126, 0.7152, 0.0722]
+
+roles:
+  default: raw
+  reference: linear
+  scene_linear: linear
+
+displays:
+  default:
+    - !<View> {name: None, colorspace: raw}
+
+active_displays: [default]
+active_views: [None]
+
+colorspaces:
+  - !<ColorSpace>
+    name: linear
+    isdata: false
+
+  - !<ColorSpace>
+    name: raw
+    isdata: true
+
+  - !<ColorSpace>
+    name: Arri LogC4
+    isdata: false
+
+  - !<ColorSpace>
+    name: Output_w_Look
+    isdata: false
+    from_reference: !<GroupTransform>
+      children:
+        - !<FileTransform> {src: cd.cdl}
+"""
+
+CLIP = "A001C001_250101_R1AB"
+ALE_ENTRY = {'Name': CLIP, 'Tape': '', 'ASC_SOP': "(1.05 0.98 1.02)(0.01 -0.005 0.0)(0.95 1.0 1.05)",
+             'ASC_SAT': "0.9", 'Episode': '101', 'Slate': '1', 'Take': '1', 'Camera': 'A'}
+
+
+def _peak_rss_mb(run) -> float:
+    """Peak resident memory added by run(), in MB (Linux: resets the high-water mark first)."""
+    def status(key):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(key):
+                    return int(line.split()[1]) / 1024
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    base = status('VmRSS')
+    run()
+    return status('VmHWM') - base
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason="needs Linux /proc memory stats")
+def test_streaming_stays_within_worker_memory_budget(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cdl, "_cdl_cache", None)
+    monkeypatch.setattr(cdl, "_ocio_config_cache", None)
+
+    # A 4.6K 16-bit still: its float crop alone (~90 MB) is larger than the budget
+    input_folder = tmp_path / "input"
+    input_folder.mkdir()
+    ramp = np.linspace(0, 65535, 4608, dtype=np.uint16)
+    pixels = np.empty((3164, 4608, 3), dtype=np.uint16)
+    pixels[...] = ramp[None, :, None]
+    stills = [str(input_folder / f"{CLIP}-10_00_00_0{i}.tif") for i in range(2)]
+    tifffile.imwrite(stills[0], pixels, photometric='rgb')
+    shutil.copy(stills[0], stills[1])
+    del pixels
+
+    template = tmp_path / "config_template.ocio"
+    template.write_text(CDL_ONLY_TEMPLATE)
+    (tmp_path / "luts").mkdir()
+    (tmp_path / "csv").mkdir()
+    budget_mb = 96
+    config = Config(
+        input_folder=str(input_folder), output_folder=str(tmp_path / "output"),
+        lut_dir=str(tmp_path / "luts"), frame_csv_folder=str(tmp_path / "csv"),
+        lab_ale_folder=str(tmp_path), config_template_path=str(template),
+        silverstack_csv_folder=str(tmp_path), cache_dir=str(tmp_path / "cache"),
+        font_path=os.path.join(STATIC_DIR, "fonts", "monarcha-regular.ttf"),
+        logo_image=os.path.join(STATIC_DIR, "logo_image.png"),
+        tool_image=os.path.join(STATIC_DIR, "tool_image.png"),
+        streaming=True, max_worker_memory=budget_mb, prefetch=0
+    )
+    assert config.el_zone_overlay  # The default, which once forced a full-resolution decode
+
+    processor = StillProcessor(config, {CLIP: ALE_ENTRY}, {}, LazyCSVLoader(config.frame_csv_folder))
+    assert processor.streaming
+
+    # The first still loads fonts, logos and color processors that later stills share
+    assert processor.process_image(stills[0])
+    assert processor.flush_writes() == []
+
+    def run():
+        assert processor.process_image(stills[1])
+        assert processor.flush_writes() == []
+
+    peak = _peak_rss_mb(run)
+    assert peak <= budget_mb, f"peak {peak:.0f} MB over a {budget_mb} MB budget"
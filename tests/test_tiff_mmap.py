@@ -0,0 +1,33 @@
+# test_tiff_mmap.py - Tests for memory-mapped TIFF access
+import numpy as np
+import pytest
+
+tifffile = pytest.importorskip("tifffile")
+
+from stillgen.tiff_mmap import map_tiff
+
+
+@pytest.mark.parametrize("samples", [3, 4])
+def test_map_tiff_maps_rgb_pixels(tmp_path, samples):
+    path = str(tmp_path / "rgb.tif")
+    pixels = np.arange(6 * 5 * samples, dtype=np.uint16).reshape(6, 5, samples)
+    tifffile.imwrite(path, pixels, photometric='rgb',
+                     extrasamples=['unassalpha'] if samples == 4 else None)
+
+    mapped = map_tiff(path)
+    assert mapped is not None
+    np.testing.assert_array_equal(mapped, pixels)
+
+
+@pytest.mark.parametrize("shape, extrasamples", [
+    ((6, 5), None),
+    ((6, 5, 2), None),
+    ((6, 5, 3), ['unspecified'] * 2),
+    ((6, 5, 4), ['unspecified'] * 3),
+])
+def test_map_tiff_rejects_gray_pixels(tmp_path, shape, extrasamples):
+    path = str(tmp_path / "gray.tif")
+    tifffile.imwrite(path, np.zeros(shape, dtype=np.uint8), photometric='minisblack',
+                     planarconfig='contig', extrasamples=extrasamples)
+
+    assert map_tiff(path) is None
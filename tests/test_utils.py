@@ -0,0 +1,31 @@
+# test_utils.py - Tests for shared file helpers
+import os
+
+import pytest
+
+from stillgen.utils import write_atomic
+
+
+def _write_text(path: str, content: str):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_write_atomic_renames_into_place(tmp_path):
+    output_path = str(tmp_path / "look.cdl")
+
+    write_atomic(output_path, _write_text, "slope")
+
+    assert open(output_path).read() == "slope"
+    assert os.listdir(tmp_path) == ["look.cdl"]
+
+
+def test_write_atomic_removes_temp_file_on_failure(tmp_path):
+    def fail(path: str):
+        _write_text(path, "partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_atomic(str(tmp_path / "look.cdl"), fail)
+
+    assert os.listdir(tmp_path) == []